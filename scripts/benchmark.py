@@ -0,0 +1,1092 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the GitHub Profile Widgets Generator.
+
+Runs the generator against a local mock of the GitHub REST and GraphQL
+APIs so timings are reproducible and don't spend real rate limit. The mock
+serves synthetic data by default, or a fixture recorded with `record`.
+
+Usage:
+  python scripts/benchmark.py fetch [--repos 50 200 1000] [--latency 0.01] [--workers 8]
+  python scripts/benchmark.py session [--requests 200] [--handshake 0.02]
+  python scripts/benchmark.py cache [--repos 200] [--latency 0.01]
+  python scripts/benchmark.py incremental [--repos 1000] [--changed 0.05]
+  python scripts/benchmark.py record fixture.json.gz [--user NAME]
+  python scripts/benchmark.py backends [--fixture fixture.json.gz] [--repos 500] [--latency 0.02]
+  python scripts/benchmark.py svg [--elements 1000] [--scales 1 10 100]
+  python scripts/benchmark.py optimize [--dna-points 60 600 6000]
+  python scripts/benchmark.py skyline [--repos 18 36 100 1000] [--repeat 5]
+  python scripts/benchmark.py lod [--repos 100 1000 10000 100000] [--repeat 5]
+  python scripts/benchmark.py records [--repos 1000 10000 100000]
+  python scripts/benchmark.py snapshot [--repos 100 1000 5000] [--latency 0.005]
+  python scripts/benchmark.py batch [--users 5] [--repos 200] [--latency 0.005] [--handshake 0.02]
+  python scripts/benchmark.py ratelimit [--repos 300] [--budget 200]
+  python scripts/benchmark.py coalesce [--callers 16] [--rounds 5] [--latency 0.05]
+  python scripts/benchmark.py startup [--runs 5] [--top 8]
+  python scripts/benchmark.py trace [--repos 500] [--latency 0.002] [--out trace.json]
+  python scripts/benchmark.py suite [--repos 10 100 1000 10000 100000] [--languages 30] [--events 1000]
+                                    [--out results.json] [--baseline results.json]
+"""
+
+import argparse
+import contextlib
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_widgets as gw  # noqa: E402
+
+# ============================================================
+# MOCK GITHUB API
+# ============================================================
+
+BENCH_LANGS = ["TypeScript", "Python", "JavaScript", "Go", "Rust", "CSS", "HTML", "Shell"]
+
+
+def mock_repos(count, owner="bench-user"):
+    """Build `count` REST-shaped repo payloads."""
+    return [
+        {
+            "name": f"repo-{i:05d}",
+            "full_name": f"{owner}/repo-{i:05d}",
+            "fork": False,
+            "language": BENCH_LANGS[i % len(BENCH_LANGS)],
+            "stargazers_count": i % 17,
+            "size": 100 + (i * 37) % 5000,
+            "pushed_at": "2024-01-01T00:00:00Z",
+        }
+        for i in range(count)
+    ]
+
+
+def mock_languages(name):
+    """Deterministic /languages payload for a repo name."""
+    i = int(name.rsplit("-", 1)[-1]) if name.rsplit("-", 1)[-1].isdigit() else 0
+    primary = BENCH_LANGS[i % len(BENCH_LANGS)]
+    secondary = BENCH_LANGS[(i + 3) % len(BENCH_LANGS)]
+    return {primary: 1000 + (i * 131) % 40000, secondary: 200 + (i * 17) % 5000}
+
+
+def synthetic_fixture(count, owner="bench-user"):
+    """A fixture in the same shape `record` writes, built from mock data."""
+    repos = mock_repos(count, owner)
+    return {
+        "user": {"login": owner, "name": "Bench User", "public_repos": count, "followers": 0, "following": 0},
+        "repos": repos,
+        "languages": {repo["name"]: mock_languages(repo["name"]) for repo in repos},
+        "events": [],
+    }
+
+
+def load_fixture(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as f:
+        return json.load(f)
+
+
+class MockGitHub:
+    """A threaded local HTTP server that mimics the endpoints we call."""
+
+    def __init__(self, repo_count=0, latency=0.0, handshake=0.0, owner="bench-user", fixture=None, rate_limit=None):
+        self.fixture = fixture or synthetic_fixture(repo_count, owner)
+        self.owner = self.fixture["user"]["login"]
+        self.repos = self.fixture["repos"]
+        self.latency = latency
+        # Extra delay per new connection, standing in for a TCP+TLS handshake
+        self.handshake = handshake
+        self.requests = 0
+        self.not_modified = 0
+        # REST budget in the style of X-RateLimit-*; None serves no headers
+        self.rate_limit = self.rate_remaining = rate_limit
+        self.rate_reset = int(time.time()) + 3600
+        self.refused = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def route(self, path, query):
+        """Return (status, body, extra_headers) for a request path."""
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] == ["users"] and len(parts) == 2:
+            return 200, self.fixture["user"], {}
+        if parts[:1] == ["users"] and parts[2:] == ["repos"]:
+            return self.paginate(path, query, self.repos)
+        if parts[:1] == ["users"] and parts[2:] == ["events", "public"]:
+            return self.paginate(path, query, self.fixture["events"])
+        if parts[:1] == ["repos"] and parts[3:] == ["languages"]:
+            return 200, self.languages(parts[2]), {}
+        return 404, {"message": "Not Found"}, {}
+
+    def languages(self, name):
+        known = self.fixture["languages"].get(name)
+        return known if known is not None else mock_languages(name)
+
+    def graphql(self, variables):
+        """Answer GRAPHQL_REPOS_QUERY from the same fixture."""
+        repos = [repo for repo in self.repos if not repo.get("fork")]
+        start = int(variables.get("after") or 0)
+        per_lang = variables.get("languages", 20)
+        nodes = []
+        for repo in repos[start:start + 100]:
+            langs = sorted(self.languages(repo["name"]).items(), key=lambda x: x[1], reverse=True)
+            nodes.append({
+                "name": repo["name"],
+                "description": repo.get("description"),
+                "stargazerCount": repo.get("stargazers_count", 0),
+                "diskUsage": repo.get("size", 0),
+                "pushedAt": repo.get("pushed_at"),
+                "updatedAt": repo.get("updated_at"),
+                "createdAt": repo.get("created_at"),
+                "primaryLanguage": {"name": repo["language"]} if repo.get("language") else None,
+                "languages": {"edges": [{"size": b, "node": {"name": l}} for l, b in langs[:per_lang]]},
+            })
+        user = self.fixture["user"]
+        return {"data": {"user": {
+            "login": user["login"],
+            "name": user.get("name"),
+            "followers": {"totalCount": user.get("followers", 0)},
+            "following": {"totalCount": user.get("following", 0)},
+            "repositories": {
+                "totalCount": len(repos),
+                "pageInfo": {"hasNextPage": start + 100 < len(repos), "endCursor": str(start + 100)},
+                "nodes": nodes,
+            },
+        }}}
+
+    def paginate(self, path, query, items):
+        """Serve one page of `items` with a GitHub-style Link header."""
+        params = parse_qs(query)
+        per_page = int(params.get("per_page", ["30"])[0])
+        page = int(params.get("page", ["1"])[0])
+        start = (page - 1) * per_page
+        headers = {}
+        if start + per_page < len(items):
+            headers["Link"] = f'<{self.url}{path}?per_page={per_page}&page={page + 1}>; rel="next"'
+        return 200, items[start:start + per_page], headers
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this a
+            # kept-alive connection stalls on Nagle + delayed ACK
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+                if mock.handshake:
+                    time.sleep(mock.handshake)
+
+            def do_GET(self):
+                self.count_and_wait()
+                parsed = urlparse(self.path)
+                self.respond(*mock.route(parsed.path, parsed.query), metered=True)
+
+            def do_POST(self):
+                self.count_and_wait()
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if urlparse(self.path).path != "/graphql":
+                    return self.respond(404, {"message": "Not Found"}, {})
+                self.respond(200, mock.graphql(request.get("variables") or {}), {})
+
+            def count_and_wait(self):
+                with mock._lock:
+                    mock.requests += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+
+            def respond(self, status, body, extra, metered=False):
+                payload = json.dumps(body).encode()
+                etag = f'"{hashlib.md5(payload).hexdigest()}"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    with mock._lock:
+                        mock.not_modified += 1
+                    status, payload = 304, b""
+                if metered and mock.rate_limit is not None:
+                    # Like GitHub, a 304 doesn't spend budget
+                    with mock._lock:
+                        if status != 304 and mock.rate_remaining <= 0:
+                            mock.refused += 1
+                            status, payload = 403, json.dumps({"message": "API rate limit exceeded"}).encode()
+                        elif status != 304:
+                            mock.rate_remaining -= 1
+                        extra = {
+                            **extra,
+                            "X-RateLimit-Limit": str(mock.rate_limit),
+                            "X-RateLimit-Remaining": str(mock.rate_remaining),
+                            "X-RateLimit-Reset": str(mock.rate_reset),
+                            "X-RateLimit-Resource": "core",
+                        }
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@contextlib.contextmanager
+def pointed_at(mock, cache_dir="", snapshot_dir=""):
+    """Point the generator module at a mock server for the duration.
+
+    The on-disk HTTP cache and language snapshot are off unless directories
+    are given (and the activity store is always off), so benchmarks never
+    read or pollute the real .cache directory. Requests are still
+    coalesced but not memoized, so back-to-back runs each really fetch.
+    """
+    names = ("GITHUB_API_URL", "USERNAME", "HTTP_CACHE_DIR", "LANG_SNAPSHOT_DIR", "ACTIVITY_DB", "API_FLIGHTS")
+    saved = {name: getattr(gw, name) for name in names}
+    values = (mock.url, mock.owner, cache_dir, snapshot_dir, "", gw.SingleFlight(0))
+    for name, value in zip(names, values):
+        setattr(gw, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(gw, name, value)
+
+
+def quiet(fn, *args, **kwargs):
+    """Call fn with its progress output swallowed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+
+def bench_fetch(args):
+    """Sequential vs. concurrent /languages fan-out in fetch_user_data."""
+    print(f"fetch_user_data · {args.latency * 1000:.0f} ms simulated latency per request")
+    print(f"{'repos':>7} {'sequential':>12} {f'workers={args.workers}':>12} {'speedup':>9} {'fetched':>8}  match")
+    saved_workers = gw.FETCH_WORKERS
+    try:
+        for count in args.repos:
+            with MockGitHub(count, latency=args.latency) as mock, pointed_at(mock):
+                timings = []
+                results = []
+                for workers in (1, args.workers):
+                    gw.FETCH_WORKERS = workers
+                    start = time.perf_counter()
+                    results.append(quiet(gw.fetch_user_data))
+                    timings.append(time.perf_counter() - start)
+            seq, par = timings
+            match = results[0]["languages"] == results[1]["languages"] and \
+                list(results[0]["languages"]) == list(results[1]["languages"])
+            print(f"{count:>7} {seq:>11.2f}s {par:>11.2f}s {seq / par:>8.1f}x "
+                  f"{results[1]['total_repos']:>8}  {'yes' if match else 'NO'}")
+    finally:
+        gw.FETCH_WORKERS = saved_workers
+
+
+def bench_session(args):
+    """Per-request latency: a fresh connection per call vs. the shared session."""
+    import requests
+    
+    print(f"{args.requests} sequential GETs · {args.handshake * 1000:.0f} ms simulated handshake per connection")
+    print(f"{'transport':>16} {'total':>9} {'per req':>9} {'opened':>7} {'reused':>7}")
+    saved_transport = gw.HTTP_TRANSPORT
+    with MockGitHub(1, handshake=args.handshake) as mock, pointed_at(mock):
+        endpoint = f"/repos/{mock.owner}/repo-00000/languages"
+
+        before = mock.connections
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            requests.get(f"{mock.url}{endpoint}", timeout=30).json()
+        elapsed = time.perf_counter() - start
+        opened = mock.connections - before
+        print(f"{'requests.get':>16} {elapsed:>8.2f}s {elapsed / args.requests * 1000:>7.2f}ms "
+              f"{opened:>7} {args.requests - opened:>7}")
+
+        try:
+            for name, transport in (("urllib session", "urllib"), ("pooled session", "requests")):
+                gw.HTTP_TRANSPORT = transport
+                gw.close_session()
+                start = time.perf_counter()
+                for _ in range(args.requests):
+                    gw.github_api(endpoint)
+                elapsed = time.perf_counter() - start
+                conns = gw.connection_stats()
+                print(f"{name:>16} {elapsed:>8.2f}s {elapsed / args.requests * 1000:>7.2f}ms "
+                      f"{conns['opened']:>7} {conns['reused']:>7}")
+        finally:
+            gw.close_session()
+            gw.HTTP_TRANSPORT = saved_transport
+
+
+def bench_cache(args):
+    """Cold vs. warm run of fetch_user_data through the ETag cache."""
+    print(f"fetch_user_data · {args.repos} repos · {args.latency * 1000:.0f} ms simulated latency per request")
+    print(f"{'run':>6} {'time':>8} {'requests':>9} {'304s':>6} {'cache size':>11}")
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            MockGitHub(args.repos, latency=args.latency) as mock, pointed_at(mock, cache_dir):
+        for run in ("cold", "warm"):
+            before = (mock.requests, mock.not_modified)
+            start = time.perf_counter()
+            quiet(gw.fetch_user_data)
+            elapsed = time.perf_counter() - start
+            size = sum(e.stat().st_size for e in os.scandir(cache_dir))
+            print(f"{run:>6} {elapsed:>7.2f}s {mock.requests - before[0]:>9} "
+                  f"{mock.not_modified - before[1]:>6} {size / 1024:>9.0f}KB")
+
+
+def bench_incremental(args):
+    """Full refetch vs. snapshot-based delta update of language totals.
+
+    The incremental run's listing also returns one pushed repo twice, as
+    paging by sort=updated does when a push lands mid-listing; a second
+    incremental run over the clean listing checks the snapshot kept no
+    trace of it.
+    """
+    print(f"fetch_user_data · {args.repos} repos · {args.changed:.0%} pushed since last run · "
+          f"1 repo deleted · 1 listed twice")
+    print(f"{'run':>12} {'time':>8} {'requests':>9}")
+    with tempfile.TemporaryDirectory() as snapshot_dir, \
+            MockGitHub(args.repos, latency=args.latency) as mock, pointed_at(mock, snapshot_dir=snapshot_dir):
+        runs = {}
+
+        def run(label):
+            before = mock.requests
+            start = time.perf_counter()
+            runs[label] = quiet(gw.fetch_user_data)
+            print(f"{label:>12} {time.perf_counter() - start:>7.2f}s {mock.requests - before:>9}")
+
+        run("cold")
+        # Simulate a day of activity: a few pushes with new bytes, one deletion
+        step = max(1, int(1 / args.changed)) if args.changed else len(mock.repos) + 1
+        for repo in mock.repos[::step]:
+            repo["pushed_at"] = "2024-06-01T00:00:00Z"
+            repo["name"] = repo["name"].replace("repo-", "repo-1")
+        mock.repos.pop()
+        mock.fixture["user"]["public_repos"] = len(mock.repos)
+        mock.repos.append(dict(mock.repos[0]))
+        run("incremental")
+        mock.repos.pop()
+        run("unchanged")
+        gw.LANG_SNAPSHOT_DIR = ""
+        run("full")
+
+    def summary(label):
+        return runs[label]["languages"], runs[label]["total_repos"]
+    match = summary("incremental") == summary("unchanged") == summary("full")
+    print(f"incremental totals match full rebuild: {'yes' if match else 'NO'}")
+
+
+# Repo fields kept in a recorded fixture; enough for both backends
+FIXTURE_REPO_FIELDS = (
+    "name", "full_name", "fork", "language", "stargazers_count", "size",
+    "description", "pushed_at", "updated_at", "created_at",
+)
+
+
+def record_fixture(args):
+    """Record the live API responses for a user into a fixture file."""
+    if not gw.GITHUB_TOKEN:
+        sys.exit("record needs GITHUB_TOKEN")
+    gw.USERNAME = args.user or gw.USERNAME
+    gw.HTTP_CACHE_DIR = gw.LANG_SNAPSHOT_DIR = ""
+    print(f"Recording @{gw.USERNAME}...")
+    repos = [{k: repo.get(k) for k in FIXTURE_REPO_FIELDS} for repo in gw.iter_user_repos()]
+    sources = [repo for repo in repos if not repo["fork"]]
+    fixture = {
+        "user": gw.github_api(f"/users/{gw.USERNAME}") or {},
+        "repos": repos,
+        "languages": {repo["name"]: langs or {} for repo, langs, _ in gw.fetch_repo_languages(sources)},
+        "events": gw.github_api(f"/users/{gw.USERNAME}/events/public", {"per_page": 100}) or [],
+    }
+    opener = gzip.open if args.path.endswith(".gz") else open
+    with opener(args.path, "wt") as f:
+        json.dump(fixture, f)
+    print(f"Wrote {args.path}: {len(repos)} repos, {len(fixture['events'])} events")
+
+
+def bench_backends(args):
+    """Request count and wall time: REST vs. GraphQL over the same fixture."""
+    fixture = load_fixture(args.fixture) if args.fixture else synthetic_fixture(args.repos)
+    print(f"@{fixture['user']['login']} · {len(fixture['repos'])} repos · "
+          f"{args.latency * 1000:.0f} ms simulated latency per request")
+    print(f"{'backend':>8} {'requests':>9} {'time':>8}")
+    results = {}
+    with MockGitHub(latency=args.latency, fixture=fixture) as mock, pointed_at(mock):
+        saved_graphql_url = gw.GITHUB_GRAPHQL_URL
+        gw.GITHUB_GRAPHQL_URL = ""
+        try:
+            for name in gw.DATA_SOURCES:
+                before = mock.requests
+                start = time.perf_counter()
+                results[name] = quiet(gw.get_data_source(name))
+                elapsed = time.perf_counter() - start
+                print(f"{name:>8} {mock.requests - before:>9} {elapsed:>7.2f}s")
+        finally:
+            gw.GITHUB_GRAPHQL_URL = saved_graphql_url
+
+    rest, graphql = results["rest"], results["graphql"]
+    for key in ("languages", "total_repos", "total_stars", "daily_activity"):
+        print(f"  {key:<15} {'same' if rest[key] == graphql[key] else 'DIFFERS'}")
+    same_repos = [(r.name, r.size, r.stars) for r in rest["repos"]] == \
+        [(r.name, r.size, r.stars) for r in graphql["repos"]]
+    print(f"  {'repos':<15} {'same' if same_repos else 'DIFFERS'}")
+
+
+def _svg_fragments(count):
+    for i in range(count):
+        yield f'  <rect x="{i % 800:.1f}" y="{i % 320:.1f}" width="4" height="6" rx="1" fill="#3178C6" opacity="0.4"/>\n'
+
+
+def _build_concat(count):
+    svg = gw.svg_header(800, 320, "bench")
+    for fragment in _svg_fragments(count):
+        svg += fragment
+    svg += gw.svg_footer()
+    return len(svg)
+
+
+def _build_writer(count, stream=None):
+    svg = gw.SvgWriter(stream)
+    svg += gw.svg_header(800, 320, "bench")
+    for fragment in _svg_fragments(count):
+        svg += fragment
+    svg += gw.svg_footer()
+    svg.getvalue()
+    return svg.size
+
+
+def bench_svg(args):
+    """Throughput and peak memory: string concatenation vs. SvgWriter."""
+    builds = ("concat", "writer", "streamed")
+    print(f"MB/s (best of {args.repeat}) · peak traced memory in MB")
+    print(f"{'elements':>9} " + " ".join(f"{b:>9} {'peak':>6}" for b in builds))
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "out.svg")
+
+        def run(build, count):
+            if build == "concat":
+                return _build_concat(count)
+            if build == "writer":
+                return _build_writer(count)
+            with open(out_path, "w") as f:
+                return _build_writer(count, f)
+
+        for scale in args.scales:
+            count = args.elements * scale
+            cells = []
+            for build in builds:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    size = run(build, count)
+                    best = min(best, time.perf_counter() - start)
+                tracemalloc.start()
+                run(build, count)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                cells.append(f"{size / best / 1e6:>9.1f} {peak / 1e6:>6.1f}")
+            print(f"{count:>9} " + " ".join(cells))
+
+
+def bench_optimize(args):
+    """Output size per widget with and without the optimization stage."""
+    data = quiet(gw.get_mock_data)
+    saved = (gw.SVG_OPTIMIZE, gw.DNA_POINTS)
+    print(f"{'widget':<18} {'dna pts':>8} {'plain':>10} {'optimized':>10} {'saved':>7}")
+    try:
+        for points in args.dna_points:
+            gw.DNA_POINTS = points
+            for name, (func, _) in gw.WIDGETS.items():
+                if points != args.dna_points[0] and func is not gw.generate_code_dna:
+                    continue
+                sizes = []
+                for optimize in (False, True):
+                    gw.SVG_OPTIMIZE = optimize
+                    sizes.append(len(quiet(gw.render_widget, func, data).encode()))
+                plain, optimized = sizes
+                print(f"{name:<18} {points:>8} {plain:>10,} {optimized:>10,} {1 - optimized / plain:>6.0%}")
+    finally:
+        gw.SVG_OPTIMIZE, gw.DNA_POINTS = saved
+
+
+EVENT_TYPES = ["PushEvent", "CreateEvent", "PullRequestEvent", "IssuesEvent", "WatchEvent", "IssueCommentEvent"]
+
+
+def synthetic_data(repos, languages, events, seed=0):
+    """Widget `data` for a synthetic account.
+
+    `languages` names are drawn from LANG_COLORS first, then made up;
+    repos get a skewed spread of sizes and stars, and `events` public
+    events are spread over the last 30 days. The same arguments always
+    give the same data.
+    """
+    rng = random.Random(seed)
+    names = list(gw.LANG_COLORS)[:languages]
+    names += [f"Lang{i:03d}" for i in range(len(names), languages)]
+    payloads = []
+    totals = {}
+    for i in range(repos):
+        language = names[min(int(rng.expovariate(3 / max(languages, 1))), languages - 1)] if languages else None
+        size = int(rng.lognormvariate(7, 1.2))
+        payloads.append({
+            "name": f"repo-{i:06d}",
+            "language": language,
+            "stargazers_count": int(rng.paretovariate(1.5)) - 1,
+            "size": size,
+        })
+        if language:
+            totals[language] = totals.get(language, 0) + size * 100
+    now = datetime.now(timezone.utc)
+    feed = (
+        {
+            "type": rng.choice(EVENT_TYPES),
+            "created_at": (now - timedelta(seconds=rng.randrange(30 * 86400))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for _ in range(events)
+    )
+    user = {"login": "bench-user", "name": "Bench User", "public_repos": repos, "followers": 0, "following": 0}
+    return gw.build_data(user, gw.load_repos(payloads), totals, gw.summarize_events(feed))
+
+
+def skyline_data(count):
+    """Widget `data` with `count` repos of varied size, for skyline scaling."""
+    repos = gw.load_repos(mock_repos(count))
+    totals = {}
+    for repo in repos:
+        totals[repo.language] = totals.get(repo.language, 0) + repo.size * 1000
+    return gw.build_data({"login": "bench-user"}, repos, totals, gw.summarize_events([]))
+
+
+def bench_skyline(args):
+    """Repo Skyline size, element count and render time per window mode."""
+    saved = (gw.SKYLINE_MAX_REPOS, gw.SKYLINE_WINDOWS)
+    print(f"{'repos':>6} {'mode':<8} {'bytes':>10} {'elements':>9} {'ms':>8}")
+    try:
+        for count in args.repos:
+            data = skyline_data(count)
+            gw.SKYLINE_MAX_REPOS = count
+            for mode in ("rect", "use", "pattern"):
+                gw.SKYLINE_WINDOWS = mode
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    out = quiet(gw.generate_repo_skyline, data)
+                    best = min(best, time.perf_counter() - start)
+                elements = len(re.findall(r"<[a-zA-Z]", out))
+                print(f"{count:>6} {mode:<8} {len(out.encode()):>10,} {elements:>9,} {best * 1000:>8.2f}")
+    finally:
+        gw.SKYLINE_MAX_REPOS, gw.SKYLINE_WINDOWS = saved
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    """Fastest of `repeat` calls, in seconds, plus the last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_lod(args):
+    """Repo Skyline with and without district LOD as repo count grows."""
+    saved = (gw.SKYLINE_LOD, gw.SKYLINE_WINDOWS)
+    gw.SKYLINE_WINDOWS = "pattern"
+    k = gw.SKYLINE_MAX_REPOS
+    print(f"{'repos':>7} {'top-k sort':>11} {'top-k heap':>11} {'lod':>4} {'bytes':>8} {'elements':>9} {'render ms':>10}")
+    try:
+        for count in args.repos:
+            data = skyline_data(count)
+            size = attrgetter("size")
+            sort_s, _ = best_of(args.repeat, lambda: sorted(data["repos"], key=size, reverse=True)[:k])
+            heap_s, _ = best_of(args.repeat, heapq.nlargest, k, data["repos"], key=size)
+            for lod in (False, True):
+                gw.SKYLINE_LOD = lod
+                render_s, out = best_of(args.repeat, quiet, gw.generate_repo_skyline, data)
+                elements = len(re.findall(r"<[a-zA-Z]", out))
+                print(f"{count:>7} {sort_s * 1000:>9.2f}ms {heap_s * 1000:>9.2f}ms {'on' if lod else 'off':>4} "
+                      f"{len(out.encode()):>8,} {elements:>9,} {render_s * 1000:>10.2f}")
+    finally:
+        gw.SKYLINE_LOD, gw.SKYLINE_WINDOWS = saved
+
+
+def _repo_dicts(payloads):
+    # The per-repo dicts fetch_user_data used to keep
+    return [
+        {
+            "name": p["name"],
+            "language": p["language"] or "Other",
+            "stars": p["stargazers_count"],
+            "size": p["size"],
+            "languages": mock_languages(p["name"]),
+            "description": "A synthetic repository used for benchmarking",
+            "updated_at": p["pushed_at"],
+            "created_at": p["pushed_at"],
+        }
+        for p in payloads
+    ]
+
+
+def bench_records(args):
+    """Memory held by the repo list: per-repo dicts vs. Repo records."""
+    print(f"{'repos':>7} {'dicts':>10} {'records':>10} {'saved':>6}")
+    for count in args.repos:
+        payloads = json.loads(json.dumps(mock_repos(count)))
+        sizes = []
+        for build in (_repo_dicts, gw.load_repos):
+            tracemalloc.start()
+            repos = build(payloads)
+            sizes.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            del repos
+        dicts, records = sizes
+        print(f"{count:>7} {dicts / 1024:>8.0f}KB {records / 1024:>8.0f}KB {1 - records / dicts:>5.0%}")
+
+
+def bench_snapshot(args):
+    """Fetching live vs. loading a data snapshot, and rendering from it."""
+    saved_render_cache = gw.RENDER_CACHE_DIR
+    gw.RENDER_CACHE_DIR = ""
+    print(f"{'repos':>6} {'fetch':>8} {'save':>8} {'load':>8} {'snapshot':>10} {'render':>8}")
+    try:
+        for count in args.repos:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "data.json.gz")
+                with MockGitHub(count, latency=args.latency) as mock, pointed_at(mock):
+                    start = time.perf_counter()
+                    data = quiet(gw.fetch_user_data)
+                    fetch_s = time.perf_counter() - start
+                    save_s, _ = best_of(1, gw.save_data_snapshot, data, path)
+                load_s, (_, data) = best_of(3, gw.load_data_snapshot, path)
+                # Widgets only: the README target writes to the working directory
+                targets = [t for t in gw.render_targets(tmp) if t[1] is not gw.generate_readme]
+                render_s, _ = best_of(1, quiet, gw.render_all, data, targets)
+                print(f"{count:>6} {fetch_s:>7.2f}s {save_s * 1000:>6.1f}ms {load_s * 1000:>6.1f}ms "
+                      f"{os.path.getsize(path):>8,} B {render_s * 1000:>6.1f}ms")
+    finally:
+        gw.RENDER_CACHE_DIR = saved_render_cache
+
+
+def bench_batch(args):
+    """Separate runs per user vs. one batch sharing the connection pool.
+
+    Both make the same requests; the batch reuses its keep-alive
+    connections across users instead of reconnecting for each one.
+    """
+    users = [f"user-{i}" for i in range(args.users)]
+    saved = (gw.GITHUB_TOKEN, gw.RENDER_CACHE_DIR)
+    gw.GITHUB_TOKEN, gw.RENDER_CACHE_DIR = "bench-token", ""
+    print(f"{args.users} users · {args.repos} repos each · {args.latency * 1000:.0f} ms latency · "
+          f"{args.handshake * 1000:.0f} ms handshake")
+    print(f"{'mode':>9} {'time':>8} {'requests':>9} {'connections':>12}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp, \
+                MockGitHub(args.repos, latency=args.latency, handshake=args.handshake) as mock, pointed_at(mock):
+            for mode in ("separate", "batch"):
+                gw.close_session()
+                before = (mock.requests, mock.connections)
+                start = time.perf_counter()
+                if mode == "batch":
+                    quiet(gw.generate_batch, users, os.path.join(tmp, mode))
+                else:
+                    # What launching the script once per user amounts to
+                    for user in users:
+                        gw.close_session()
+                        quiet(gw.generate_batch, [user], os.path.join(tmp, mode))
+                elapsed = time.perf_counter() - start
+                print(f"{mode:>9} {elapsed:>7.2f}s {mock.requests - before[0]:>9} {mock.connections - before[1]:>12}")
+            gw.close_session()
+    finally:
+        gw.GITHUB_TOKEN, gw.RENDER_CACHE_DIR = saved
+
+
+class BlindRateLimiter(gw.RateLimiter):
+    """Ignores the budget headers: every request is sent, as before."""
+
+    def update(self, headers):
+        pass
+
+
+def bench_ratelimit(args):
+    """Fetches that need more requests than the remaining budget allows.
+
+    "cold" starts with no caches; "pushed" follows a full run that warmed
+    them, after every repo was pushed to and its language bytes changed,
+    so each /languages call is due again and none is a free 304. Each
+    phase gets `budget` requests.
+    """
+    print(f"{args.repos} repos · budget of {args.budget} requests per phase")
+    print(f"{'limiter':>9} {'phase':>7} {'sent':>6} {'refused':>8} {'stale':>6} {'skipped':>8} {'w/ langs':>9}")
+    saved = gw.RATE_LIMITER
+    try:
+        for name, limiter in (("blind", BlindRateLimiter), ("budgeted", gw.RateLimiter)):
+            with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as snapshot_dir, \
+                    MockGitHub(args.repos, latency=0.002, rate_limit=args.budget) as mock, \
+                    pointed_at(mock, cache_dir, snapshot_dir):
+                phases = [("cold", args.budget), ("warm-up", None), ("pushed", args.budget)]
+                for phase, budget in phases:
+                    gw.RATE_LIMITER = limiter()
+                    gw.API_STATS.clear()
+                    gw.close_session()
+                    mock.rate_remaining = budget if budget is not None else 10 ** 9
+                    before = (mock.requests, mock.refused)
+                    if phase == "pushed":
+                        for repo in mock.repos:
+                            repo["pushed_at"] = "2025-06-01T00:00:00Z"
+                            langs = mock_languages(repo["name"])
+                            mock.fixture["languages"][repo["name"]] = {l: b + 1 for l, b in langs.items()}
+                    quiet(gw.fetch_user_data)
+                    if phase == "warm-up":
+                        continue
+                    # Repos whose language bytes made it into the totals
+                    entries = gw.load_language_snapshot()["repos"].values()
+                    with_langs = sum(1 for entry in entries if entry["languages"])
+                    print(f"{name:>9} {phase:>7} {mock.requests - before[0]:>6} {mock.refused - before[1]:>8} "
+                          f"{gw.API_STATS['stale']:>6} {gw.API_STATS['skipped']:>8} {with_langs:>9}")
+                gw.close_session()
+    finally:
+        gw.RATE_LIMITER = saved
+
+
+class NoFlight:
+    """Stand-in for SingleFlight that lets every call through."""
+
+    def do(self, key, fn, ok=None):
+        return fn()
+
+
+def bench_coalesce(args):
+    """Concurrent and repeated identical GETs with and without SingleFlight."""
+    print(f"{args.callers} threads × {args.rounds} rounds of the same GET · {args.latency * 1000:.0f} ms latency")
+    print(f"{'mode':>14} {'time':>8} {'requests':>9} {'coalesced':>10} {'memo hits':>10}")
+    modes = (("off", NoFlight()), ("single-flight", gw.SingleFlight(0)), ("+ memo", gw.SingleFlight(60)))
+    with MockGitHub(1, latency=args.latency) as mock, pointed_at(mock):
+        endpoint = f"/repos/{mock.owner}/repo-00000/languages"
+        for name, flights in modes:
+            gw.API_FLIGHTS = flights
+            gw.API_STATS.clear()
+            before = mock.requests
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                barrier = threading.Barrier(args.callers)
+
+                def call():
+                    barrier.wait()
+                    gw.github_api(endpoint)
+
+                threads = [threading.Thread(target=call) for _ in range(args.callers)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+            elapsed = time.perf_counter() - start
+            print(f"{name:>14} {elapsed:>7.2f}s {mock.requests - before:>9} "
+                  f"{gw.API_STATS['coalesced']:>10} {gw.API_STATS['memo_hits']:>10}")
+        gw.close_session()
+
+
+def import_times(statement):
+    """Run `statement` in a fresh interpreter under -X importtime.
+
+    Returns {module: (self_us, cumulative_us)} for what the statement
+    imports; interpreter startup (everything up to `site`) is left out.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          cwd=here, capture_output=True, text=True, check=True)
+    times, started = {}, False
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if not m:
+            continue
+        if started:
+            times[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+        elif m.group(4) == "site" and m.group(3) == " ":
+            started = True
+    return times
+
+
+def bench_startup(args):
+    """Interpreter startup: importing the generator and a full mock render.
+
+    `import generate_widgets` loads the cached .pyc, but running the file
+    as a script (as the workflow does) compiles it from source every time,
+    so the compile is its own row and both ways of running are timed. The
+    requests row is what the first real fetch adds on top, now that it is
+    imported lazily.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    script = os.path.join(here, "generate_widgets.py")
+    runs = [import_times("import generate_widgets") for _ in range(args.runs)]
+    extra = [import_times("import generate_widgets, requests") for _ in range(args.runs)]
+    module_ms = statistics.median(t["generate_widgets"][1] for t in runs) / 1000
+    requests_ms = statistics.median(t["requests"][1] for t in extra) / 1000
+    with open(script, encoding="utf-8") as f:
+        source = f.read()
+    compile_s, _ = best_of(args.runs, compile, source, script, "exec")
+    walls = {"script": [], "module": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "GITHUB_TOKEN": "", "OUTPUT_DIR": os.path.join(tmp, "widgets"),
+               "RENDER_CACHE_DIR": "", "ACTIVITY_DB": "", "PYTHONPATH": here}
+        commands = {"script": [sys.executable, script], "module": [sys.executable, "-m", "generate_widgets"]}
+        for _ in range(args.runs):
+            for kind, command in commands.items():
+                start = time.perf_counter()
+                subprocess.run(command + ["--from-mock"], cwd=tmp, env=env, stdout=subprocess.DEVNULL, check=True)
+                walls[kind].append(time.perf_counter() - start)
+    print(f"median of {args.runs} fresh interpreters · {source.count(chr(10)):,} lines")
+    print(f"{'import generate_widgets':>30} {module_ms:>8.1f}ms  (cached .pyc)")
+    print(f"{'compile from source':>30} {compile_s * 1000:>8.1f}ms  (every run as a script)")
+    print(f"{'+ requests (first fetch)':>30} {requests_ms:>8.1f}ms")
+    print(f"{'script --from-mock (wall)':>30} {statistics.median(walls['script']) * 1000:>8.1f}ms")
+    print(f"{'-m module --from-mock (wall)':>30} {statistics.median(walls['module']) * 1000:>8.1f}ms")
+    lazy = ("requests", "urllib3", "numpy", "sqlite3", "concurrent.futures.process")
+    print("still imported at startup: " + (", ".join(m for m in lazy if m in runs[0]) or "none of " + ", ".join(lazy)))
+    print("\nslowest self times under import generate_widgets:")
+    for name, (self_us, _) in heapq.nlargest(args.top, runs[0].items(), key=lambda item: item[1][0]):
+        print(f"{name:>32} {self_us / 1000:>7.2f}ms")
+
+
+def bench_trace(args):
+    """Fetch + render with the tracer off and on: overhead and where time went."""
+    saved = (gw.RENDER_CACHE_DIR, gw.TRACER)
+    gw.RENDER_CACHE_DIR = ""
+    print(f"{args.repos} repos · {args.latency * 1000:.0f} ms latency")
+    print(f"{'tracer':>7} {'fetch':>8} {'render':>8} {'spans':>6}")
+    try:
+        with tempfile.TemporaryDirectory() as tmp, \
+                MockGitHub(args.repos, latency=args.latency) as mock, pointed_at(mock):
+            targets = [t for t in gw.render_targets(tmp) if t[1] is not gw.generate_readme]
+            for enabled in (False, True):
+                gw.TRACER = gw.Tracer()
+                gw.TRACER.enabled = enabled
+                gw.close_session()
+                fetch_s, data = best_of(1, quiet, gw.fetch_user_data)
+                render_s, _ = best_of(1, quiet, gw.render_all, data, targets)
+                print(f"{'on' if enabled else 'off':>7} {fetch_s:>7.2f}s {render_s * 1000:>6.1f}ms "
+                      f"{len(gw.TRACER.events):>6}")
+            gw.close_session()
+        print(f"\n{'category':>12} {'spans':>6} {'time':>10} {'bytes':>10}")
+        for cat, total in gw.TRACER.summary().items():
+            print(f"{cat:>12} {total['count']:>6} {total['seconds'] * 1000:>8.1f}ms {total['bytes']:>10,}")
+        slowest = heapq.nlargest(3, (e for e in gw.TRACER.events if e["cat"] == "github_api"), key=lambda e: e["dur"])
+        print("slowest calls: " + ", ".join(f"{e['name']} {e['dur'] / 1000:.1f}ms" for e in slowest))
+        if args.out:
+            gw.TRACER.save(args.out)
+            print(f"trace written to {args.out}")
+    finally:
+        gw.RENDER_CACHE_DIR, gw.TRACER = saved
+
+
+SUITE_WIDGETS = ("generate_code_dna", "generate_repo_skyline", "generate_skill_tree",
+                 "generate_code_weather", "generate_readme")
+
+
+def bench_suite(args):
+    """Every generator over synthetic accounts of increasing size.
+
+    Generators are called directly, so the render cache never answers.
+    Time is the best of `repeat` runs; peak memory comes from one separate
+    run under tracemalloc, so tracing doesn't skew the timings. Results go
+    to --out as JSON, and --baseline prints the ratio against an earlier
+    results file.
+    """
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            for row in json.load(f)["results"]:
+                baseline[(row["repos"], row["widget"])] = row
+    saved = gw.SVG_OPTIMIZE
+    gw.SVG_OPTIMIZE = args.optimize
+    results = []
+    print(f"{args.languages} languages · {args.events} events · best of {args.repeat}"
+          + (" · --optimize" if args.optimize else ""))
+    print(f"{'repos':>7} {'widget':<22} {'ms':>9} {'peak':>9} {'bytes':>10}" + (f" {'vs base':>8}" if baseline else ""))
+    try:
+        for count in args.repos:
+            data = synthetic_data(count, args.languages, args.events, args.seed)
+            data = {**data, "language_index": gw.LanguageIndex(data["languages"])}
+            for name in SUITE_WIDGETS:
+                func = getattr(gw, name)
+                seconds, out = best_of(args.repeat, quiet, gw.render_widget, func, data)
+                tracemalloc.start()
+                quiet(gw.render_widget, func, data)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                row = {"repos": count, "widget": name, "ms": round(seconds * 1000, 3),
+                       "peak_kb": round(peak / 1024, 1), "bytes": len(out.encode())}
+                results.append(row)
+                line = f"{count:>7} {name:<22} {row['ms']:>9.2f} {row['peak_kb']:>7.0f}KB {row['bytes']:>10,}"
+                base = baseline.get((count, name))
+                if base:
+                    line += f" {row['ms'] / max(base['ms'], 1e-6):>7.2f}x"
+                print(line)
+    finally:
+        gw.SVG_OPTIMIZE = saved
+    if args.out:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {"languages": args.languages, "events": args.events, "seed": args.seed,
+                       "repeat": args.repeat, "optimize": args.optimize},
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fetch", help="concurrent /languages fetching")
+    p.add_argument("--repos", type=int, nargs="+", default=[50, 200, 1000])
+    p.add_argument("--latency", type=float, default=0.01, help="seconds of simulated latency per request")
+    p.add_argument("--workers", type=int, default=8)
+    p.set_defaults(func=bench_fetch)
+
+    p = sub.add_parser("session", help="pooled keep-alive session vs. a connection per request")
+    p.add_argument("--requests", type=int, default=200)
+    p.add_argument("--handshake", type=float, default=0.02, help="seconds of simulated handshake per connection")
+    p.set_defaults(func=bench_session)
+
+    p = sub.add_parser("cache", help="ETag / If-None-Match revalidation")
+    p.add_argument("--repos", type=int, default=200)
+    p.add_argument("--latency", type=float, default=0.01, help="seconds of simulated latency per request")
+    p.set_defaults(func=bench_cache)
+
+    p = sub.add_parser("incremental", help="snapshot-based language delta updates")
+    p.add_argument("--repos", type=int, default=1000)
+    p.add_argument("--changed", type=float, default=0.05, help="fraction of repos pushed since the last run")
+    p.add_argument("--latency", type=float, default=0.01, help="seconds of simulated latency per request")
+    p.set_defaults(func=bench_incremental)
+
+    p = sub.add_parser("record", help="record live API responses into a fixture")
+    p.add_argument("path", help="output file (.json or .json.gz)")
+    p.add_argument("--user", help="GitHub username (default: GITHUB_USERNAME)")
+    p.set_defaults(func=record_fixture)
+
+    p = sub.add_parser("backends", help="REST vs. GraphQL data source")
+    p.add_argument("--fixture", help="recorded fixture (default: synthetic)")
+    p.add_argument("--repos", type=int, default=500, help="synthetic repo count when no fixture is given")
+    p.add_argument("--latency", type=float, default=0.02, help="seconds of simulated latency per request")
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser("svg", help="SVG string building throughput")
+    p.add_argument("--elements", type=int, default=1000, help="base element count")
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_svg)
+
+    p = sub.add_parser("optimize", help="output size reduction from --optimize")
+    p.add_argument("--dna-points", type=int, nargs="+", default=[60, 600, 6000])
+    p.set_defaults(func=bench_optimize)
+
+    p = sub.add_parser("skyline", help="Repo Skyline window instancing as repo count grows")
+    p.add_argument("--repos", type=int, nargs="+", default=[18, 36, 100, 1000])
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_skyline)
+
+    p = sub.add_parser("lod", help="Repo Skyline level-of-detail districts at org scale")
+    p.add_argument("--repos", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_lod)
+
+    p = sub.add_parser("records", help="memory of Repo records vs. per-repo dicts")
+    p.add_argument("--repos", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.set_defaults(func=bench_records)
+
+    p = sub.add_parser("snapshot", help="offline rendering from a data snapshot vs. a live fetch")
+    p.add_argument("--repos", type=int, nargs="+", default=[100, 1000, 5000])
+    p.add_argument("--latency", type=float, default=0.005)
+    p.set_defaults(func=bench_snapshot)
+
+    p = sub.add_parser("batch", help="multi-user batch mode vs. one run per user")
+    p.add_argument("--users", type=int, default=5)
+    p.add_argument("--repos", type=int, default=200)
+    p.add_argument("--latency", type=float, default=0.005)
+    p.add_argument("--handshake", type=float, default=0.02)
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser("ratelimit", help="budget-aware request scheduling under a low rate limit")
+    p.add_argument("--repos", type=int, default=300)
+    p.add_argument("--budget", type=int, default=200)
+    p.set_defaults(func=bench_ratelimit)
+
+    p = sub.add_parser("coalesce", help="single-flight coalescing of identical requests")
+    p.add_argument("--callers", type=int, default=16)
+    p.add_argument("--rounds", type=int, default=5)
+    p.add_argument("--latency", type=float, default=0.05)
+    p.set_defaults(func=bench_coalesce)
+
+    p = sub.add_parser("startup", help="import time and a --from-mock run in a fresh interpreter")
+    p.add_argument("--runs", type=int, default=5)
+    p.add_argument("--top", type=int, default=8)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("trace", help="tracing overhead and a per-stage breakdown of a mock run")
+    p.add_argument("--repos", type=int, default=500)
+    p.add_argument("--latency", type=float, default=0.002)
+    p.add_argument("--out", metavar="PATH")
+    p.set_defaults(func=bench_trace)
+
+    p = sub.add_parser("suite", help="every generator over synthetic accounts, results as JSON")
+    p.add_argument("--repos", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    p.add_argument("--languages", type=int, default=30)
+    p.add_argument("--events", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--optimize", action="store_true", help="include the --optimize output stage")
+    p.add_argument("--out", metavar="PATH")
+    p.add_argument("--baseline", metavar="PATH", help="earlier --out file to compare against")
+    p.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
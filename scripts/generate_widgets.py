@@ -11,21 +11,29 @@ Author: IAmMasterCraft
 License: MIT
 """
 
+import argparse
+import contextlib
+import gzip
 import json
 import math
 import os
 import sys
 import hashlib
-from datetime import datetime, timedelta
-from collections import defaultdict
-
-# Try to import requests - needed for GitHub API
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    os.system(f"{sys.executable} -m pip install requests --break-system-packages -q")
-    import requests
+import heapq
+import queue
+import re
+import threading
+import time
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, deque
+from dataclasses import dataclass, fields
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+# requests, sqlite3, NumPy and the process pool are imported where they're
+# first used: a snapshot or mock render never touches them, and requests
+# or NumPy alone costs more at startup than everything else here combined
 
 # ============================================================
 # CONFIGURATION
@@ -34,6 +42,85 @@ except ImportError:
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
 USERNAME = os.environ.get("GITHUB_USERNAME", "IAmMasterCraft")
 OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "widgets")
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+
+# Max concurrent /languages requests (1 = sequential)
+FETCH_WORKERS = int(os.environ.get("FETCH_WORKERS", "8"))
+
+# Shared HTTP session: keep-alive pool size and transport-level retries
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", str(max(FETCH_WORKERS, 10))))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", "0.5"))
+# "requests" (pooled keep-alive, urllib3 retries), "urllib" (stdlib only) or
+# "auto": requests when it's installed, urllib otherwise
+HTTP_TRANSPORT = os.environ.get("HTTP_TRANSPORT", "auto")
+# Seconds an identical GET is answered from memory (0 disables the memo;
+# concurrent identical GETs are coalesced into one either way)
+API_MEMO_TTL = float(os.environ.get("API_MEMO_TTL", "10"))
+
+# Rate limit scheduling: below RATE_LIMIT_SLOW_BELOW remaining requests,
+# concurrency shrinks with the budget; the last RATE_LIMIT_RESERVE (at most
+# a tenth of what the run started with) are kept for the profile, repo
+# listing and events; once spent, those wait at most
+# RATE_LIMIT_MAX_WAIT seconds for the reset before falling back to cache
+RATE_LIMIT_SLOW_BELOW = int(os.environ.get("RATE_LIMIT_SLOW_BELOW", "500"))
+RATE_LIMIT_RESERVE = int(os.environ.get("RATE_LIMIT_RESERVE", "50"))
+RATE_LIMIT_MAX_WAIT = float(os.environ.get("RATE_LIMIT_MAX_WAIT", "60"))
+
+# Widget rendering: worker count and "thread" or "process" pool
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "4"))
+RENDER_EXECUTOR = os.environ.get("RENDER_EXECUTOR", "thread")
+
+# Samples along the Code DNA helix (raise for high-resolution exports)
+DNA_POINTS = int(os.environ.get("DNA_POINTS", "60"))
+# NumPy (optional) vectorizes the helix from this many samples up; below
+# it the ~80 ms import costs more than the math it saves
+NUMPY_MIN_POINTS = int(os.environ.get("NUMPY_MIN_POINTS", "100000"))
+
+# Repo Skyline: buildings drawn, and how their windows are emitted:
+# "rect" (one element each), "use" (shared <rect> def) or "pattern"
+# (one patterned <rect> per building). Empty picks "use" when optimizing.
+SKYLINE_MAX_REPOS = int(os.environ.get("SKYLINE_MAX_REPOS", "18"))
+SKYLINE_WINDOWS = os.environ.get("SKYLINE_WINDOWS", "").lower()
+# Level of detail: repos past the cap become low-rise district blocks, one
+# per language (the smallest languages share an "Other" block)
+SKYLINE_LOD = os.environ.get("SKYLINE_LOD", "").lower() in ("1", "true", "yes")
+SKYLINE_DISTRICTS = int(os.environ.get("SKYLINE_DISTRICTS", "6"))
+
+# Output optimization: path simplification, relative commands, compact numbers
+SVG_OPTIMIZE = os.environ.get("SVG_OPTIMIZE", "").lower() in ("1", "true", "yes")
+# Max deviation (px) allowed when simplifying strand paths
+SVG_SIMPLIFY_TOLERANCE = float(os.environ.get("SVG_SIMPLIFY_TOLERANCE", "0.25"))
+
+# On-disk cache of rendered output keyed by each widget's input fingerprint
+RENDER_CACHE_DIR = os.environ.get("RENDER_CACHE_DIR", ".cache/renders")
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+# Rolling event store: raw events are kept ACTIVITY_RAW_DAYS, then compacted
+# into per-day/hour/type counters. "" disables it (one pass over the feed).
+ACTIVITY_DB = os.environ.get("ACTIVITY_DB", ".cache/activity.sqlite3")
+ACTIVITY_RAW_DAYS = int(os.environ.get("ACTIVITY_RAW_DAYS", "7"))
+# Days of activity handed to the widgets
+ACTIVITY_WINDOW_DAYS = int(os.environ.get("ACTIVITY_WINDOW_DAYS", "30"))
+
+# Chrome trace (chrome://tracing, ui.perfetto.dev) of every API call, fetch
+# stage, render and write; "" disables it
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+# cProfile stats for the whole run (python -m pstats FILE); "" disables it
+PROFILE_FILE = os.environ.get("PROFILE_FILE", "")
+
+# Backend used to fetch data: "rest" or "graphql"
+DATA_SOURCE = os.environ.get("DATA_SOURCE", "rest")
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", "")
+# Languages requested per repo by the GraphQL backend (largest first)
+GRAPHQL_LANGUAGES = int(os.environ.get("GRAPHQL_LANGUAGES", "20"))
+
+# On-disk ETag / Last-Modified cache ("" disables it)
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", ".cache/github-api")
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Per-repo language bytes from the last run, so unchanged repos skip /languages
+LANG_SNAPSHOT_DIR = os.environ.get("LANG_SNAPSHOT_DIR", ".cache/languages")
 
 # Apple-style color palette
 COLORS = {
@@ -92,24 +179,940 @@ LANG_COLORS = {
 
 DEFAULT_LANG_COLOR = "#86868B"
 
+# ============================================================
+# TRACING
+# ============================================================
+
+class Tracer:
+    """Collects timed spans as Chrome trace "complete" events.
+    
+    Spans are only recorded while enabled; a disabled tracer costs a flag
+    check per span. Timestamps are perf_counter microseconds, which every
+    process on the machine shares, so spans timed in a render worker
+    process line up with the parent's.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.threads = {}
+        self._lock = threading.Lock()
+    
+    @contextlib.contextmanager
+    def span(self, name, cat, **args):
+        """Time the body as one span; the body may add to the yielded args."""
+        if not self.enabled:
+            yield args
+            return
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, cat, start, time.perf_counter(), args)
+    
+    def add(self, name, cat, start, end, args=None, pid=None, tid=None):
+        """Record a span timed elsewhere (perf_counter start/end)."""
+        if not self.enabled:
+            return
+        pid = os.getpid() if pid is None else pid
+        if tid is None:
+            tid = threading.get_native_id()
+            if (pid, tid) not in self.threads:
+                self.threads[(pid, tid)] = threading.current_thread().name
+        event = {
+            "name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+            "ts": round(start * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+    
+    def summary(self):
+        """Per category: span count, total seconds and bytes (where known)."""
+        totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0})
+        for event in self.events:
+            total = totals[event["cat"]]
+            total["count"] += 1
+            total["seconds"] += event["dur"] / 1e6
+            total["bytes"] += event.get("args", {}).get("bytes", 0)
+        return dict(totals)
+    
+    def save(self, path):
+        names = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for (pid, tid), name in self.threads.items()
+        ]
+        trace = {
+            "traceEvents": names + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+            "otherData": {"username": USERNAME, "summary": self.summary(), "api_stats": dict(API_STATS)},
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+
+
+TRACER = Tracer()
+
+
+def run_profiled(fn, *args):
+    """Run fn under cProfile and dump the stats to PROFILE_FILE."""
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args)
+    finally:
+        profiler.dump_stats(PROFILE_FILE)
+        print(f"   Profile: {PROFILE_FILE} (python -m pstats {PROFILE_FILE})")
+
+
+# ============================================================
+# HTTP SESSION
+# ============================================================
+
+# Counters reported at the end of a run
+API_STATS = defaultdict(int)
+_stats_lock = threading.Lock()
+
+
+def bump_stat(name, amount=1):
+    with _stats_lock:
+        API_STATS[name] += amount
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def github_retry():
+    """Build the urllib3 retry policy for GitHub: 5xx, 429 and secondary rate limits.
+    
+    Secondary rate limits come back as a 403 with a Retry-After header, so a
+    403 is only retried when that header is present; any other 403 is a real
+    permission error and is returned as-is.
+    """
+    from urllib3.util.retry import Retry
+    
+    class GitHubRetry(Retry):
+        def is_retry(self, method, status_code, has_retry_after=False):
+            if status_code == 403 and has_retry_after:
+                return bool(self.total) and self._is_method_retryable(method)
+            return super().is_retry(method, status_code, has_retry_after)
+        
+        def increment(self, *args, **kwargs):
+            bump_stat("retries")
+            return super().increment(*args, **kwargs)
+    
+    return GitHubRetry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        # GraphQL queries are POSTs but read-only, so safe to replay
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        raise_on_status=False,
+    )
+
+
+class UrllibResponse:
+    """The parts of a requests.Response that the API helpers read."""
+    
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers  # http.client.HTTPMessage; lookups ignore case
+        self.content = content
+    
+    def json(self):
+        return json.loads(self.content)
+    
+    @property
+    def links(self):
+        """The Link header as {rel: {"url": ...}}, like requests parses it."""
+        links = {}
+        for part in (self.headers.get("Link") or "").split(","):
+            m = re.match(r'\s*<([^>]*)>\s*;\s*rel="?([^";]+)"?', part)
+            if m:
+                links[m.group(2)] = {"url": m.group(1)}
+        return links
+
+
+class UrllibSession:
+    """Stdlib stand-in for requests.Session, used when requests is absent.
+    
+    There's no keep-alive pool, so every request opens a connection. Retries
+    follow github_retry(): 429/5xx and a 403 with Retry-After, backing off
+    exponentially unless the server says how long to wait.
+    """
+    
+    def __init__(self):
+        self.sent = 0
+    
+    def get(self, url, headers=None, params=None, timeout=30):
+        from urllib.parse import urlencode
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+        return self._send(url, headers, None, timeout)
+    
+    def post(self, url, headers=None, timeout=30, **kwargs):
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+        return self._send(url, headers, json.dumps(kwargs.get("json")).encode(), timeout)
+    
+    def _send(self, url, headers, data, timeout):
+        import urllib.error
+        import urllib.request
+        for attempt in range(HTTP_RETRIES + 1):
+            request = urllib.request.Request(url, data=data, headers=headers or {})
+            with _stats_lock:
+                self.sent += 1
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as r:
+                    resp = UrllibResponse(r.status, r.headers, r.read())
+            except urllib.error.HTTPError as e:
+                # urllib raises for every non-2xx, 304 included
+                resp = UrllibResponse(e.code, e.headers, e.read())
+            retry_after = resp.headers.get("Retry-After")
+            retryable = resp.status_code in RETRY_STATUSES or (resp.status_code == 403 and retry_after)
+            if not retryable or attempt == HTTP_RETRIES:
+                return resp
+            bump_stat("retries")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = HTTP_BACKOFF * 2 ** attempt
+            time.sleep(delay)
+    
+    def close(self):
+        pass
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the shared session, creating it (and importing requests) on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            requests = None
+            if HTTP_TRANSPORT != "urllib":
+                try:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                except ImportError:
+                    if HTTP_TRANSPORT == "requests":
+                        raise
+            if requests is None:
+                _session = UrllibSession()
+                return _session
+            # Room for every fetch worker, even when --fetch-workers raised it
+            pool_size = max(HTTP_POOL_SIZE, FETCH_WORKERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=github_retry())
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def close_session():
+    """Close the shared session and drop its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def connection_stats():
+    """Return how many connections the shared pool opened vs. reused."""
+    if isinstance(_session, UrllibSession):
+        return {"opened": _session.sent, "reused": 0}
+    opened = sent = 0
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                opened += pool.num_connections
+                sent += pool.num_requests
+    return {"opened": opened, "reused": max(0, sent - opened)}
+
+
+# ============================================================
+# RATE LIMIT
+# ============================================================
+
+# Request priorities: profile, listings and events go first; the long tail
+# of per-repo /languages calls is the first thing shed when budget is low
+PRIORITY_HIGH, PRIORITY_LOW = 0, 1
+
+
+class RateLimiter:
+    """Meters REST requests against the budget GitHub reports back.
+
+    Every response's X-RateLimit-* headers update the remaining budget.
+    acquire() blocks while the in-flight limit for the current budget is
+    reached, lets high-priority requests jump ahead of low ones, and
+    returns False when a request should not be sent at all. Callers then
+    serve what they have cached instead.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.limit = self.remaining = self.reset = None
+        # Budget when this run first saw the current window
+        self.window_start = None
+        self.in_flight = 0
+        self.high_waiting = 0
+    
+    def capacity(self, priority):
+        """Requests allowed in flight for the current budget."""
+        if self.remaining is None or self.remaining >= RATE_LIMIT_SLOW_BELOW:
+            return float("inf")
+        cap = max(1, FETCH_WORKERS * self.remaining // RATE_LIMIT_SLOW_BELOW)
+        return cap + 1 if priority == PRIORITY_HIGH else cap
+    
+    def reserve(self):
+        """Requests held back from low-priority calls.
+        
+        A small budget would be all reserve at the full RATE_LIMIT_RESERVE,
+        leaving most of it unspent, so it's capped at a tenth of the budget.
+        """
+        if self.window_start is None:
+            return RATE_LIMIT_RESERVE
+        return min(RATE_LIMIT_RESERVE, self.window_start // 10)
+    
+    def acquire(self, priority=PRIORITY_HIGH):
+        with self._cond:
+            if priority == PRIORITY_HIGH:
+                self.high_waiting += 1
+            try:
+                while True:
+                    if self.remaining is not None and self.reset is not None and time.time() >= self.reset:
+                        # Window rolled over; the next response reports the new budget
+                        self.remaining = None
+                    budget = None if self.remaining is None else self.remaining - self.in_flight
+                    if budget is not None and budget <= 0 and not self.in_flight:
+                        wait = self.reset - time.time() if self.reset else 0
+                        if priority == PRIORITY_LOW or wait > RATE_LIMIT_MAX_WAIT:
+                            return False
+                        self._cond.wait(max(wait, 0.1))
+                        continue
+                    if priority == PRIORITY_LOW and budget is not None and budget <= self.reserve():
+                        return False
+                    may_go = budget is None or budget > 0
+                    if priority == PRIORITY_LOW and self.high_waiting:
+                        may_go = False
+                    if may_go and self.in_flight < self.capacity(priority):
+                        self.in_flight += 1
+                        return True
+                    self._cond.wait(1.0)
+            finally:
+                if priority == PRIORITY_HIGH:
+                    self.high_waiting -= 1
+                    self._cond.notify_all()
+    
+    def release(self, headers=None):
+        with self._cond:
+            self.in_flight -= 1
+            if headers is not None:
+                self.update(headers)
+            self._cond.notify_all()
+    
+    def update(self, headers):
+        """Record the budget from a response's X-RateLimit-* headers."""
+        if headers.get("X-RateLimit-Resource", "core") != "core":
+            return
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            limit = int(headers["X-RateLimit-Limit"])
+            reset = int(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if self.reset is None or reset > self.reset or self.remaining is None:
+            if self.reset != reset:
+                self.window_start = remaining
+            self.limit, self.remaining, self.reset = limit, remaining, reset
+        elif reset == self.reset:
+            # Responses can arrive out of order; the lowest count is the latest
+            self.remaining = min(self.remaining, remaining)
+    
+    def summary(self):
+        if self.limit is None:
+            return None
+        resets = datetime.fromtimestamp(self.reset).strftime("%H:%M:%S")
+        return (f"Rate limit: {self.remaining}/{self.limit} left (resets {resets}) · "
+                f"{API_STATS['requests'] - API_STATS['not_modified']} used this run · "
+                f"{API_STATS['stale']} served from cache · {API_STATS['skipped']} skipped")
+
+
+RATE_LIMITER = RateLimiter()
+
+
+# ============================================================
+# REQUEST COALESCING
+# ============================================================
+
+class SingleFlight:
+    """Runs one call per key at a time and briefly remembers the result.
+
+    A caller asking for a key that is already being fetched waits for
+    that fetch instead of starting its own; results other than failures
+    are then served from memory for `ttl` seconds.
+    """
+    
+    # Expired results are swept once the memo grows past this
+    MEMO_SWEEP_SIZE = 1024
+    
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._memo = {}
+    
+    def do(self, key, fn, ok=lambda result: True):
+        with self._lock:
+            hit = self._memo.get(key)
+            if hit is not None and hit[0] > time.monotonic():
+                bump_stat("memo_hits")
+                return hit[1]
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            bump_stat("coalesced")
+            return future.result()
+        
+        try:
+            result = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if self.ttl > 0 and ok(result):
+                now = time.monotonic()
+                if len(self._memo) >= self.MEMO_SWEEP_SIZE:
+                    self._memo = {k: v for k, v in self._memo.items() if v[0] > now}
+                self._memo[key] = (now + self.ttl, result)
+        future.set_result(result)
+        return result
+    
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+
+API_FLIGHTS = SingleFlight(API_MEMO_TTL)
+
+
+# ============================================================
+# HTTP CACHE
+# ============================================================
+
+def http_cache_key(url, params=None):
+    """Cache key for a request: the URL plus its sorted query params."""
+    raw = json.dumps([url, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _http_cache_path(key):
+    return os.path.join(HTTP_CACHE_DIR, f"{key}.json")
+
+
+def http_cache_load(key):
+    """Return the cached entry for `key`, or None."""
+    if not HTTP_CACHE_DIR:
+        return None
+    try:
+        with open(_http_cache_path(key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _open_text(path):
+    return open(path, "w", encoding="utf-8")
+
+
+def write_atomic(path, data, opener=_open_text):
+    """Write `data` via a temp file + rename so readers never see half a file.
+    
+    `opener(tmp_path)` returns the file to write to (gzip.open for
+    compressed files). The temp name is unique per process and thread, so
+    concurrent writers of the same path don't clobber each other's temp.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with opener(tmp) as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def write_json_atomic(path, obj):
+    write_atomic(path, json.dumps(obj))
+
+
+def http_cache_store(key, entry):
+    """Persist a cache entry atomically (safe with concurrent fetches)."""
+    if not HTTP_CACHE_DIR:
+        return
+    try:
+        write_json_atomic(_http_cache_path(key), entry)
+    except OSError as e:
+        print(f"  Cache write failed for {entry.get('url')}: {e}")
+
+
+def http_cache_touch(key):
+    """Mark an entry as recently used so eviction keeps it."""
+    try:
+        os.utime(_http_cache_path(key))
+    except OSError:
+        pass
+
+
+def evict_lru_files(directory, max_bytes, suffix):
+    """Delete the least recently used `suffix` files until `directory` fits."""
+    if not directory or not os.path.isdir(directory):
+        return 0
+    
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith(suffix):
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    return evicted
+
+
+def evict_http_cache(max_bytes=None):
+    """Drop least-recently-used entries until the cache fits in max_bytes."""
+    max_bytes = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    return evict_lru_files(HTTP_CACHE_DIR, max_bytes, ".json")
+
+
+# ============================================================
+# LANGUAGE SNAPSHOT
+# ============================================================
+
+LANG_SNAPSHOT_VERSION = 1
+
+
+def _language_snapshot_path(username):
+    return os.path.join(LANG_SNAPSHOT_DIR, f"{username.lower()}.json")
+
+
+def load_language_snapshot(username=None):
+    """Load the previous run's per-repo languages, or an empty snapshot."""
+    username = username or USERNAME
+    empty = {"version": LANG_SNAPSHOT_VERSION, "totals": {}, "repos": {}}
+    if not LANG_SNAPSHOT_DIR:
+        return empty
+    try:
+        with open(_language_snapshot_path(username)) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if snapshot.get("version") != LANG_SNAPSHOT_VERSION:
+        return empty
+    return snapshot
+
+
+def save_language_snapshot(snapshot, username=None):
+    if not LANG_SNAPSHOT_DIR:
+        return
+    try:
+        write_json_atomic(_language_snapshot_path(username or USERNAME), snapshot)
+    except OSError as e:
+        print(f"  Snapshot write failed: {e}")
+
+
+def repo_unchanged(repo, entry):
+    """True if a repo hasn't been pushed to or resized since the snapshot."""
+    return (
+        entry is not None
+        and entry.get("pushed_at") is not None
+        and entry["pushed_at"] == repo.get("pushed_at")
+        and entry.get("size") == repo.get("size")
+    )
+
+
+def add_language_bytes(totals, langs, sign=1):
+    for lang, bytes_count in langs.items():
+        totals[lang] += sign * bytes_count
+
+
+# ============================================================
+# ACTIVITY STORE
+# ============================================================
+
+def parse_event(event):
+    """(id, day, hour, type) for an event, or None if it has no usable timestamp."""
+    created = event.get("created_at", "")
+    try:
+        dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    event_id = str(event.get("id", ""))
+    return (
+        int(event_id) if event_id.isdigit() else 0,
+        dt.strftime("%Y-%m-%d"),
+        dt.hour,
+        event.get("type", "Unknown"),
+    )
+
+
+class ActivityStore:
+    """Append-only SQLite store of a user's public events.
+
+    New events are ingested by id (the feed is newest-first with increasing
+    ids, so we stop at the last id we've seen). Raw rows older than
+    ACTIVITY_RAW_DAYS are folded into (day, hour, type) counters, which keeps
+    the file small while 30/90/365-day windows stay a single query.
+    """
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS watermark (
+        username TEXT PRIMARY KEY,
+        last_event_id INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS events (
+        username TEXT NOT NULL,
+        id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        hour INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        PRIMARY KEY (username, id)
+    );
+    CREATE TABLE IF NOT EXISTS activity_counts (
+        username TEXT NOT NULL,
+        day TEXT NOT NULL,
+        hour INTEGER NOT NULL,
+        type TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (username, day, hour, type)
+    );
+    """
+    
+    def __init__(self, path):
+        import sqlite3
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(self.SCHEMA)
+    
+    def close(self):
+        self.db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def last_event_id(self, username):
+        row = self.db.execute("SELECT last_event_id FROM watermark WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else 0
+    
+    def ingest(self, username, events):
+        """Append events newer than the watermark; returns how many were new.
+
+        `events` must be newest-first (as the API returns them); iteration
+        stops at the first already-seen id so older pages aren't fetched.
+        """
+        last_id = self.last_event_id(username)
+        rows = []
+        for event in events:
+            parsed = parse_event(event)
+            if parsed is None:
+                continue
+            if parsed[0] <= last_id:
+                break
+            rows.append((username, *parsed))
+        
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?)", rows)
+            if rows:
+                self.db.execute(
+                    "INSERT INTO watermark VALUES (?, ?) "
+                    "ON CONFLICT(username) DO UPDATE SET last_event_id = MAX(last_event_id, excluded.last_event_id)",
+                    (username, max(row[1] for row in rows)),
+                )
+        return len(rows)
+    
+    def compact(self, username, keep_days=None):
+        """Fold raw events older than keep_days into the counters table."""
+        keep_days = ACTIVITY_RAW_DAYS if keep_days is None else keep_days
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).strftime("%Y-%m-%d")
+        with self.db:
+            self.db.execute(
+                "INSERT INTO activity_counts (username, day, hour, type, count) "
+                "SELECT username, day, hour, type, COUNT(*) FROM events "
+                "WHERE username = ? AND day < ? GROUP BY day, hour, type "
+                "ON CONFLICT(username, day, hour, type) DO UPDATE SET count = count + excluded.count",
+                (username, cutoff),
+            )
+            return self.db.execute("DELETE FROM events WHERE username = ? AND day < ?", (username, cutoff)).rowcount
+    
+    def window(self, username, days):
+        """daily/hourly/type activity over the last `days` days."""
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        rows = self.db.execute(
+            "SELECT day, hour, type, SUM(n) FROM ("
+            "  SELECT day, hour, type, 1 AS n FROM events WHERE username = ? AND day >= ?"
+            "  UNION ALL"
+            "  SELECT day, hour, type, count FROM activity_counts WHERE username = ? AND day >= ?"
+            ") GROUP BY day, hour, type",
+            (username, since, username, since),
+        )
+        
+        daily_activity = defaultdict(int)
+        hourly_activity = defaultdict(int)
+        event_types = defaultdict(int)
+        for day, hour, event_type, count in rows:
+            daily_activity[day] += count
+            hourly_activity[hour] += count
+            event_types[event_type] += count
+        
+        return {
+            "daily_activity": dict(sorted(daily_activity.items())),
+            "hourly_activity": dict(sorted(hourly_activity.items())),
+            "event_types": dict(event_types),
+        }
+
+
+# ============================================================
+# REPO RECORDS
+# ============================================================
+
+@dataclass(slots=True)
+class Repo:
+    """A repository, reduced to the fields the widgets read."""
+    
+    name: str
+    language: str
+    stars: int
+    size: int
+    
+    def __post_init__(self):
+        # A few dozen distinct languages shared by thousands of repos
+        self.language = sys.intern(self.language or "Other")
+
+
+def repo_record(item):
+    """Repo from a REST /repos payload or a get_mock_data()-style dict
+    (which has "stars" rather than "stargazers_count")."""
+    if isinstance(item, Repo):
+        return item
+    stars = item["stars"] if "stars" in item else item.get("stargazers_count")
+    return Repo(item.get("name", ""), item.get("language"), stars or 0, item.get("size") or 0)
+
+
+def load_repos(items):
+    return [repo_record(item) for item in items]
+
+
 # ============================================================
 # GITHUB API
 # ============================================================
 
-def github_api(endpoint, params=None):
-    """Make a GitHub API request."""
+def github_get(url, params=None, priority=PRIORITY_HIGH):
+    """GET a GitHub API URL and return (body, next_page_url, stale).
+
+    `stale` is True when the rate limit kept the request from being
+    answered and the body is an old cached copy. Concurrent identical
+    requests share one HTTP call, and a fresh answer is reused for
+    API_MEMO_TTL seconds (see SingleFlight).
+    """
+    return API_FLIGHTS.do(
+        http_cache_key(url, params),
+        lambda: _github_get(url, params, priority),
+        ok=lambda result: result[0] is not None and not result[2],
+    )
+
+
+def _github_get(url, params, priority):
+    """Fetch for github_get(), with no coalescing.
+
+    Responses carrying an ETag or Last-Modified are cached on disk and
+    revalidated with a conditional request next time; a 304 is answered
+    from the cache and doesn't count against the rate limit. When the
+    rate limiter holds a request back, or GitHub refuses it for being
+    over the limit, the cached response is served as-is if there is one.
+    """
     headers = {"Accept": "application/vnd.github.v3+json"}
     if GITHUB_TOKEN:
         headers["Authorization"] = f"token {GITHUB_TOKEN}"
     
-    url = f"https://api.github.com{endpoint}"
-    resp = requests.get(url, headers=headers, params=params, timeout=30)
+    key = http_cache_key(url, params)
+    cached = http_cache_load(key)
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    
+    if not RATE_LIMITER.acquire(priority):
+        return serve_stale(cached)
+    resp = None
+    with TRACER.span("GET " + url.removeprefix(GITHUB_API_URL).split("?")[0], "github_api") as span:
+        try:
+            resp = get_session().get(url, headers=headers, params=params, timeout=30)
+        finally:
+            RATE_LIMITER.release(resp.headers if resp is not None else None)
+        span.update(status=resp.status_code, bytes=len(resp.content))
+    bump_stat("requests")
+    
+    if resp.status_code == 304 and cached:
+        bump_stat("not_modified")
+        http_cache_touch(key)
+        return cached["body"], cached.get("next"), False
     
     if resp.status_code == 200:
-        return resp.json()
+        body = resp.json()
+        next_url = resp.links.get("next", {}).get("url")
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            http_cache_store(key, {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "next": next_url,
+                "body": body,
+            })
+        return body, next_url, False
+    elif resp.status_code == 429 or (resp.status_code == 403 and resp.headers.get("X-RateLimit-Remaining") == "0"):
+        return serve_stale(cached)
     else:
-        print(f"API Error {resp.status_code}: {endpoint}")
-        return None
+        print(f"API Error {resp.status_code}: {url.removeprefix(GITHUB_API_URL)}")
+        return None, None, False
+
+
+def serve_stale(cached):
+    """Fallback for a request the rate limit kept from being answered."""
+    if cached:
+        bump_stat("stale")
+        return cached["body"], cached.get("next"), True
+    bump_stat("skipped")
+    return None, None, False
+
+
+def github_api(endpoint, params=None, priority=PRIORITY_HIGH):
+    """Make a GitHub API request."""
+    return github_get(f"{GITHUB_API_URL}{endpoint}", params, priority)[0]
+
+
+def github_api_pages(endpoint, params=None):
+    """Yield each page of a paginated endpoint, following Link rel="next"."""
+    url = f"{GITHUB_API_URL}{endpoint}"
+    while url:
+        body, url, _ = github_get(url, params)
+        # The next link already carries the query string
+        params = None
+        if body is None:
+            return
+        yield body
+
+
+def prefetch(iterable, depth=1):
+    """Iterate `iterable` on a background thread, staying `depth` items ahead.
+
+    Used to download the next page of a listing while the caller is still
+    working through the current one.
+    """
+    items = queue.Queue(maxsize=depth)
+    
+    def produce():
+        try:
+            for item in iterable:
+                items.put((True, item))
+        except Exception as e:
+            items.put((False, e))
+        items.put((False, None))
+    
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        ok, item = items.get()
+        if ok:
+            yield item
+        elif item is None:
+            return
+        else:
+            raise item
+
+
+def iter_user_repos(username=None):
+    """Yield every repo owned by the user, one page at a time."""
+    username = username or USERNAME
+    pages = github_api_pages(f"/users/{username}/repos", {"per_page": 100, "sort": "updated"})
+    for page in prefetch(pages):
+        yield from page
+
+
+def fetch_repo_languages(repos, workers=None, lookup=None):
+    """Yield (repo, languages, stale) in the same order as `repos`.
+
+    The /languages calls are fanned out over a thread pool with a bounded
+    number of requests in flight. Results are handed back in input order so
+    the merged totals don't depend on which request finished first.
+
+    `lookup(repo)` may return already-known languages for a repo, in which
+    case no request is made. Languages are None when the request failed,
+    and `stale` is True when they are an old cached answer served because
+    of the rate limit.
+    """
+    workers = FETCH_WORKERS if workers is None else workers
+    
+    def fetch(repo):
+        full_name = repo.get("full_name") or f"{USERNAME}/{repo.get('name', '')}"
+        body, _, stale = github_get(f"{GITHUB_API_URL}/repos/{full_name}/languages", priority=PRIORITY_LOW)
+        return body, stale
+    
+    def known(repo):
+        langs = lookup(repo) if lookup else None
+        return None if langs is None else (langs, False)
+    
+    if workers <= 1:
+        for repo in repos:
+            yield repo, *(known(repo) or fetch(repo))
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for repo in repos:
+            result = known(repo)
+            if result is None:
+                future = pool.submit(fetch, repo)
+            else:
+                future = Future()
+                future.set_result(result)
+            pending.append((repo, future))
+            # Keep the window bounded so we never queue the whole account
+            if len(pending) >= workers * 2:
+                done_repo, future = pending.popleft()
+                yield done_repo, *future.result()
+        while pending:
+            done_repo, future = pending.popleft()
+            yield done_repo, *future.result()
 
 
 def fetch_user_data():
@@ -119,41 +1122,113 @@ def fetch_user_data():
     # User profile
     user = github_api(f"/users/{USERNAME}") or {}
     
-    # Repositories (up to 100)
-    repos = github_api(f"/users/{USERNAME}/repos", {"per_page": 100, "sort": "updated"}) or []
-    
-    # Language stats per repo
-    lang_totals = defaultdict(int)
+    # Language stats per repo. Repos stream in page by page, so the
+    # /languages fan-out starts before the whole listing has arrived.
+    # Totals start from the last snapshot and are patched by delta: only
+    # repos pushed to (or resized) since then are refetched.
+    snapshot = load_language_snapshot()
+    previous = snapshot["repos"]
+    lang_totals = defaultdict(int, snapshot["totals"])
+    current = {}
+    skipped = fetched = 0
     repo_data = []
     
-    for repo in repos:
-        if repo.get("fork"):
-            continue
-        
+    def known_languages(repo):
+        entry = previous.get(repo.get("name", ""))
+        return entry["languages"] if repo_unchanged(repo, entry) else None
+    
+    listed = 0
+    stage_start = time.perf_counter()
+    
+    def sources():
+        # A push during pagination moves a repo across pages (sort=updated),
+        # so the listing can return it twice; it's only counted once
+        nonlocal listed
+        seen = set()
+        for repo in iter_user_repos():
+            name = repo.get("name", "")
+            if name in seen:
+                continue
+            seen.add(name)
+            listed += 1
+            if not repo.get("fork"):
+                yield repo
+    
+    for repo, langs, stale in fetch_repo_languages(sources(), lookup=known_languages):
         name = repo.get("name", "")
-        lang = repo.get("language") or "Other"
-        stars = repo.get("stargazers_count", 0)
         size = repo.get("size", 0)
         
-        # Fetch languages for this repo
-        langs = github_api(f"/repos/{USERNAME}/{name}/languages") or {}
-        for l, bytes_count in langs.items():
-            lang_totals[l] += bytes_count
+        entry = previous.pop(name, None)
+        pushed_at = repo.get("pushed_at")
+        if repo_unchanged(repo, entry):
+            skipped += 1
+        else:
+            fetched += 1
+            if langs is None:
+                # Fetch failed: keep the last known bytes and retry next run
+                langs = entry["languages"] if entry else {}
+                pushed_at = None
+            elif stale:
+                # An old cached answer is the best we have now, but it may
+                # predate the push, so the repo is refetched next run
+                pushed_at = None
+            if entry:
+                add_language_bytes(lang_totals, entry["languages"], -1)
+            add_language_bytes(lang_totals, langs)
+        current[name] = {"pushed_at": pushed_at, "size": size, "languages": langs}
         
-        repo_data.append({
-            "name": name,
-            "language": lang,
-            "stars": stars,
-            "size": size,
-            "languages": langs,
-            "description": repo.get("description", ""),
-            "updated_at": repo.get("updated_at", ""),
-            "created_at": repo.get("created_at", ""),
-        })
-    
-    # Events (recent activity)
-    events = github_api(f"/users/{USERNAME}/events/public", {"per_page": 100}) or []
-    
+        repo_data.append(repo_record(repo))
+    TRACER.add("repos + languages", "fetch", stage_start, time.perf_counter(),
+               {"repos": len(current), "unchanged": skipped})
+    
+    # A listing cut short (rate limit, API errors) says nothing about the
+    # repos it never reached, so their last known bytes stay in the totals
+    if listed < user.get("public_repos", 0) and previous:
+        print(f"  Repo listing incomplete ({listed}/{user['public_repos']}), keeping last known languages for the rest")
+        current.update(previous)
+        previous = {}
+    
+    # An empty listing after a non-empty snapshot is an API failure, not an
+    # account that deleted everything, so the old totals are kept as they are
+    if current or not previous:
+        # Repos gone since the snapshot (deleted, renamed, now forks)
+        for entry in previous.values():
+            add_language_bytes(lang_totals, entry["languages"], -1)
+        lang_totals = {l: b for l, b in lang_totals.items() if b > 0}
+        save_language_snapshot({"version": LANG_SNAPSHOT_VERSION, "totals": lang_totals, "repos": current})
+    lang_totals = dict(lang_totals)
+    print(f"  Languages: {fetched} repos fetched, {skipped} unchanged (skipped)")
+    
+    with TRACER.span("activity", "fetch"):
+        activity = fetch_activity()
+    return build_data(user, repo_data, lang_totals, activity)
+
+
+def iter_user_events(username=None):
+    """Yield public events newest-first across every page of the feed."""
+    username = username or USERNAME
+    for page in github_api_pages(f"/users/{username}/events/public", {"per_page": 100}):
+        yield from page
+
+
+def fetch_activity():
+    """Summarize the public event feed into daily/hourly/type counters.
+
+    With ACTIVITY_DB set, only events newer than the last run are pulled
+    and history accumulates beyond what the feed itself still returns.
+    """
+    if ACTIVITY_DB:
+        with ActivityStore(ACTIVITY_DB) as store:
+            new_events = store.ingest(USERNAME, iter_user_events())
+            store.compact(USERNAME)
+            print(f"  Activity: {new_events} new events")
+            return store.window(USERNAME, ACTIVITY_WINDOW_DAYS)
+    
+    return summarize_events(iter_user_events())
+
+
+def summarize_events(events):
+    """Count events per day, hour of day and type."""
     # Contribution-like data from events
     daily_activity = defaultdict(int)
     hourly_activity = defaultdict(int)
@@ -172,17 +1247,149 @@ def fetch_user_data():
         event_types[event.get("type", "Unknown")] += 1
     
     return {
-        "user": user,
-        "repos": repo_data,
-        "languages": dict(lang_totals),
         "daily_activity": dict(daily_activity),
         "hourly_activity": dict(hourly_activity),
         "event_types": dict(event_types),
+    }
+
+
+def build_data(user, repo_data, lang_totals, activity):
+    """Assemble the `data` dict every widget generator reads."""
+    return {
+        "user": user,
+        "repos": repo_data,
+        "languages": lang_totals,
+        **activity,
         "total_repos": len(repo_data),
-        "total_stars": sum(r["stars"] for r in repo_data),
+        "total_stars": sum(r.stars for r in repo_data),
     }
 
 
+# ============================================================
+# GRAPHQL BACKEND
+# ============================================================
+
+GRAPHQL_REPOS_QUERY = """
+query($login: String!, $after: String, $languages: Int!) {
+  user(login: $login) {
+    login
+    name
+    followers { totalCount }
+    following { totalCount }
+    repositories(first: 100, after: $after, privacy: PUBLIC, isFork: false,
+                 ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        stargazerCount
+        diskUsage
+        pushedAt
+        updatedAt
+        createdAt
+        primaryLanguage { name }
+        languages(first: $languages, orderBy: {field: SIZE, direction: DESC}) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def github_graphql(query, variables=None):
+    """Run a GraphQL query; returns the `data` object or None on error."""
+    headers = {"Accept": "application/json"}
+    if GITHUB_TOKEN:
+        headers["Authorization"] = f"bearer {GITHUB_TOKEN}"
+    
+    url = GITHUB_GRAPHQL_URL or f"{GITHUB_API_URL}/graphql"
+    with TRACER.span("POST /graphql", "github_api") as span:
+        resp = get_session().post(url, headers=headers, json={"query": query, "variables": variables or {}}, timeout=30)
+        span.update(status=resp.status_code, bytes=len(resp.content))
+    bump_stat("requests")
+    
+    if resp.status_code != 200:
+        print(f"GraphQL Error {resp.status_code}")
+        return None
+    body = resp.json()
+    if body.get("errors"):
+        print(f"GraphQL Error: {body['errors'][0].get('message', 'unknown')}")
+        return None
+    return body.get("data")
+
+
+def fetch_user_data_graphql():
+    """Fetch the same data as fetch_user_data via GraphQL.
+
+    Repositories come back with their language edges, stars and sizes in
+    pages of 100, so the per-repo /languages round trips disappear. The
+    event feed has no GraphQL equivalent and still goes through REST.
+    """
+    print(f"Fetching data for @{USERNAME} via GraphQL...")
+    
+    user = {}
+    lang_totals = defaultdict(int)
+    repo_data = []
+    cursor = None
+    
+    while True:
+        result = github_graphql(GRAPHQL_REPOS_QUERY, {
+            "login": USERNAME,
+            "after": cursor,
+            "languages": GRAPHQL_LANGUAGES,
+        })
+        node = (result or {}).get("user")
+        if not node:
+            break
+        
+        repos = node["repositories"]
+        if not user:
+            user = {
+                "login": node["login"],
+                "name": node["name"],
+                "public_repos": repos["totalCount"],
+                "followers": node["followers"]["totalCount"],
+                "following": node["following"]["totalCount"],
+            }
+        
+        for repo in repos["nodes"]:
+            langs = {edge["node"]["name"]: edge["size"] for edge in repo["languages"]["edges"]}
+            add_language_bytes(lang_totals, langs)
+            repo_data.append(Repo(
+                repo["name"],
+                (repo.get("primaryLanguage") or {}).get("name"),
+                repo.get("stargazerCount") or 0,
+                repo.get("diskUsage") or 0,
+            ))
+        
+        if not repos["pageInfo"]["hasNextPage"]:
+            break
+        cursor = repos["pageInfo"]["endCursor"]
+    
+    return build_data(user, repo_data, dict(lang_totals), fetch_activity())
+
+
+# ============================================================
+# DATA SOURCES
+# ============================================================
+
+# Where the widget `data` dict comes from: REST v3 (one listing, plus one
+# /languages call per changed repo) or GraphQL v4 (repos and their
+# languages in pages of 100). Both return the shape build_data() makes.
+DATA_SOURCES = {"rest": fetch_user_data, "graphql": fetch_user_data_graphql}
+
+
+def get_data_source(name=None):
+    """The fetch function for `name` (DATA_SOURCE env by default)."""
+    name = (name or DATA_SOURCE).lower()
+    if name not in DATA_SOURCES:
+        raise ValueError(f"Unknown DATA_SOURCE {name!r} (expected one of: {', '.join(DATA_SOURCES)})")
+    return DATA_SOURCES[name]
+
+
 def get_mock_data():
     """Return mock data for testing/preview."""
     return {
@@ -193,7 +1400,7 @@ def get_mock_data():
             "followers": 45,
             "following": 30,
         },
-        "repos": [
+        "repos": load_repos([
             {"name": "awesome-project", "language": "TypeScript", "stars": 12, "size": 2400, "languages": {"TypeScript": 45000, "JavaScript": 12000, "CSS": 8000}},
             {"name": "api-gateway", "language": "Python", "stars": 8, "size": 1800, "languages": {"Python": 38000, "Shell": 2000}},
             {"name": "react-dashboard", "language": "JavaScript", "stars": 15, "size": 3200, "languages": {"JavaScript": 52000, "CSS": 15000, "HTML": 8000}},
@@ -208,7 +1415,7 @@ def get_mock_data():
             {"name": "mobile-app", "language": "Dart", "stars": 3, "size": 2800, "languages": {"Dart": 40000}},
             {"name": "algorithms", "language": "Python", "stars": 2, "size": 600, "languages": {"Python": 18000}},
             {"name": "css-framework", "language": "CSS", "stars": 11, "size": 1900, "languages": {"CSS": 35000, "HTML": 5000, "JavaScript": 3000}},
-        ],
+        ]),
         "languages": {
             "JavaScript": 105000, "TypeScript": 75000, "Python": 84000,
             "CSS": 92000, "HTML": 36000, "Vue": 25000, "Shell": 14000,
@@ -226,10 +1433,89 @@ def get_mock_data():
     }
 
 
+# ============================================================
+# DATA SNAPSHOT
+# ============================================================
+
+DATA_SNAPSHOT_VERSION = 1
+
+
+def save_data_snapshot(data, path):
+    """Write fetched `data` to a gzip-compressed JSON snapshot.
+
+    Repos are stored as rows under a field list rather than as objects,
+    which keeps snapshots of large accounts small.
+    """
+    repo_fields = [f.name for f in fields(Repo)]
+    payload = {
+        "version": DATA_SNAPSHOT_VERSION,
+        "username": USERNAME,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repo_fields": repo_fields,
+        "data": {
+            **data,
+            "repos": [[getattr(r, name) for name in repo_fields] for r in data["repos"]],
+        },
+    }
+    write_atomic(path, json.dumps(payload, separators=(",", ":")),
+                 lambda tmp: gzip.open(tmp, "wt", encoding="utf-8"))
+
+
+def load_data_snapshot(path):
+    """Read a snapshot written by save_data_snapshot.
+
+    Returns (username, data); raises ValueError for other versions.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != DATA_SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: snapshot version {payload.get('version')!r}, expected {DATA_SNAPSHOT_VERSION}")
+    data = payload["data"]
+    repo_fields = payload["repo_fields"]
+    data["repos"] = [Repo(**dict(zip(repo_fields, row))) for row in data["repos"]]
+    # JSON object keys are always strings; hours are ints everywhere else
+    data["hourly_activity"] = {int(h): n for h, n in data.get("hourly_activity", {}).items()}
+    return payload["username"], data
+
+
 # ============================================================
 # SVG HELPERS
 # ============================================================
 
+class SvgWriter:
+    """Collects SVG fragments without quadratic string concatenation.
+
+    Supports the same `svg += '...'` style the generators are written in,
+    but appends to a list that is joined once at the end. Given a `stream`
+    (an open text file), fragments are written straight through instead
+    and nothing is kept in memory.
+    """
+    
+    def __init__(self, stream=None):
+        self._parts = []
+        self._stream = stream
+        self.size = 0
+    
+    def write(self, fragment):
+        self.size += len(fragment)
+        if self._stream is not None:
+            self._stream.write(fragment)
+        else:
+            self._parts.append(fragment)
+    
+    def __iadd__(self, fragment):
+        self.write(fragment)
+        return self
+    
+    def getvalue(self):
+        """The document so far (empty when streaming to a file)."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
+    
+    __str__ = getvalue
+
+
 def svg_header(width, height, title=""):
     """Generate SVG header with Apple-style base styles."""
     return f'''<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" fill="none">
@@ -269,17 +1555,227 @@ def svg_footer():
 def get_lang_color(lang):
     return LANG_COLORS.get(lang, DEFAULT_LANG_COLOR)
 
+def stable_hash(text):
+    """32-bit hash of a string that, unlike hash(), is the same in every process."""
+    return zlib.crc32(text.encode())
+
+def window_mask(name, rows, cols):
+    """Bitmask of lit windows for a skyline building.
+
+    Bit `row * cols + col` is set when that window is lit (about two in
+    three are). Seeded from the repo name, so a repo always gets the same
+    pattern and identical data renders byte-for-byte identical SVG.
+    """
+    seed = stable_hash(name)
+    mask = 0
+    for i in range(rows * cols):
+        # Murmur-style finalizer over (seed, window index)
+        h = (seed ^ (i * 0x9E3779B1)) & 0xFFFFFFFF
+        h = ((h ^ (h >> 16)) * 0x45D9F3B) & 0xFFFFFFFF
+        h ^= h >> 16
+        if h % 3:
+            mask |= 1 << i
+    return mask
+
+
+# ============================================================
+# LANGUAGE INDEX
+# ============================================================
+
+# Skill Tree columns, in display order; anything else lands in "Other"
+SKILL_CATEGORIES = {
+    "Frontend": ["JavaScript", "TypeScript", "HTML", "CSS", "SCSS", "Vue", "Svelte", "Dart"],
+    "Backend": ["Python", "Java", "Go", "Rust", "Ruby", "PHP", "C#", "Kotlin", "Scala", "Elixir", "Perl", "C", "C++", "Haskell"],
+    "Data & ML": ["Jupyter Notebook", "R", "Lua"],
+    "DevOps": ["Shell", "Dockerfile"],
+}
+LANG_CATEGORY = {lang: cat for cat, langs in SKILL_CATEGORIES.items() for lang in langs}
+
+
+class LanguageIndex:
+    """Everything the widgets derive from `data["languages"]`, built once.
+
+    `ranked` is (language, bytes) largest first, in the same order as
+    sorted(..., reverse=True); `rank`, `percent` and `color` are keyed by
+    language, and `categories` maps each non-empty Skill Tree category to
+    its languages in rank order.
+    """
+    
+    __slots__ = ("ranked", "total", "max_bytes", "rank", "percent", "color", "categories")
+    
+    def __init__(self, languages):
+        self.ranked = sorted(languages.items(), key=lambda x: x[1], reverse=True)
+        self.total = sum(languages.values()) or 1
+        self.max_bytes = self.ranked[0][1] if self.ranked else 1
+        self.rank = {lang: i for i, (lang, _) in enumerate(self.ranked)}
+        self.percent = {lang: b / self.total * 100 for lang, b in self.ranked}
+        self.color = {lang: get_lang_color(lang) for lang, _ in self.ranked}
+        
+        categories = {cat: [] for cat in SKILL_CATEGORIES}
+        categories["Other"] = []
+        for lang, b in self.ranked:
+            categories[LANG_CATEGORY.get(lang, "Other")].append((lang, b))
+        self.categories = {cat: items for cat, items in categories.items() if items}
+    
+    def __len__(self):
+        return len(self.ranked)
+    
+    def top(self, k):
+        return self.ranked[:k]
+
+
+def language_index(data):
+    """The LanguageIndex for `data`, reusing the one render_all attached."""
+    index = data.get("language_index")
+    if index is None:
+        index = LanguageIndex(data.get("languages", {}))
+    return index
+
+
+# ============================================================
+# SVG OPTIMIZATION
+# ============================================================
+
+def simplify_polyline(xs, ys, tolerance):
+    """Ramer-Douglas-Peucker: indices of the points to keep.
+
+    Drops every point that lies within `tolerance` of the line between the
+    points kept around it. Iterative, so long strands can't hit the
+    recursion limit.
+    """
+    n = len(xs)
+    if n < 3:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        x0, y0, x1, y1 = xs[first], ys[first], xs[last], ys[last]
+        dx, dy = x1 - x0, y1 - y0
+        norm = math.hypot(dx, dy) or 1.0
+        max_dist, index = 0.0, first
+        for i in range(first + 1, last):
+            dist = abs(dy * (xs[i] - x0) - dx * (ys[i] - y0)) / norm
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if max_dist > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [i for i in range(n) if keep[i]]
+
+
+def _tenths(n):
+    """Format an integer count of tenths as the shortest SVG number."""
+    sign = "-" if n < 0 else ""
+    whole, frac = divmod(abs(n), 10)
+    if not frac:
+        return f"{sign}{whole}"
+    return f"{sign}{whole if whole else ''}.{frac}"
+
+
+def relative_path(xs, ys):
+    """Path data with one absolute moveto and relative linetos.
+
+    Coordinates are snapped to 0.1px first so the relative steps add up
+    to exactly the same points an absolute path would hit.
+    """
+    tx = [round(x * 10) for x in xs]
+    ty = [round(y * 10) for y in ys]
+    steps = []
+    for i in range(1, len(tx)):
+        steps.append(_tenths(tx[i] - tx[i - 1]))
+        steps.append(_tenths(ty[i] - ty[i - 1]))
+    # A minus sign already separates numbers
+    body = " ".join(steps).replace(" -", "-")
+    return f"M{_tenths(tx[0])} {_tenths(ty[0])}" + (f"l{body}" if body else "")
+
+
+_DECIMAL_ATTR_RE = re.compile(r'="(-?)(\d+)\.(\d+)"')
+_BETWEEN_TAGS_RE = re.compile(r">\s+<")
+_LINE_BREAK_RE = re.compile(r"\n\s*")
+
+
+def _compact_decimal(match):
+    sign, whole, frac = match.groups()
+    frac = frac.rstrip("0")
+    whole = whole.lstrip("0")
+    if not frac:
+        return f'="{sign}{whole or "0"}"'
+    return f'="{sign}{whole}.{frac}"'
+
+
+def compact_svg(svg):
+    """Shorten numeric attributes (12.0 -> 12, 0.40 -> .4) and drop the
+    indentation between tags and style rules. Our text nodes never span
+    lines, so their content is left untouched."""
+    svg = _DECIMAL_ATTR_RE.sub(_compact_decimal, svg)
+    svg = _BETWEEN_TAGS_RE.sub("><", svg)
+    return _LINE_BREAK_RE.sub("", svg)
+
 
 # ============================================================
 # WIDGET 1: CODE DNA
 # ============================================================
 
+_numpy = None
+
+
+def load_numpy():
+    """Import NumPy on first use; None when it isn't installed."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def helix_geometry(num_points, start_x, width, center_y, amplitude, freq_mod, phase_offset):
+    """Sample the double helix once for every layer that draws it.
+
+    Returns x, sin, y1 (front strand) and y2 (back strand) for sample
+    positions 0..num_points. From NUMPY_MIN_POINTS up, and with NumPy
+    installed, the math is vectorized and the results handed back as plain
+    float lists (formatting NumPy scalars one by one is slower than the
+    math saved); otherwise as array('d').
+    """
+    np = load_numpy() if num_points >= NUMPY_MIN_POINTS else None
+    if np is not None:
+        t = np.arange(num_points + 1) / num_points
+        sin = np.sin(t * math.pi * 4 * freq_mod + phase_offset)
+        return {
+            "x": (start_x + t * width).tolist(),
+            "sin": sin.tolist(),
+            "y1": (center_y + sin * amplitude).tolist(),
+            "y2": (center_y - sin * amplitude).tolist(),
+        }
+    
+    ts = [i / num_points for i in range(num_points + 1)]
+    sin = array("d", [math.sin(t * math.pi * 4 * freq_mod + phase_offset) for t in ts])
+    return {
+        "x": array("d", [start_x + t * width for t in ts]),
+        "sin": sin,
+        "y1": array("d", [center_y + v * amplitude for v in sin]),
+        "y2": array("d", [center_y - v * amplitude for v in sin]),
+    }
+
+
+def polyline_path(xs, ys):
+    """SVG path data through the given points."""
+    return "M " + " L ".join(map("{:.1f} {:.1f}".format, xs, ys))
+
+
 def generate_code_dna(data):
     """Generate a unique DNA helix fingerprint from coding patterns."""
     print("  Generating Code DNA...")
     
     width, height = 800, 280
-    svg = svg_header(width, height, f"@{USERNAME}'s Code DNA")
+    svg = SvgWriter()
+    svg += svg_header(width, height, f"@{USERNAME}'s Code DNA")
     svg += svg_card_bg(width, height)
     
     # Title area
@@ -288,8 +1784,9 @@ def generate_code_dna(data):
     
     # Build DNA sequence from user data
     languages = data.get("languages", {})
-    total_bytes = sum(languages.values()) or 1
-    sorted_langs = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:8]
+    index = language_index(data)
+    sorted_langs = index.top(8)
+    rung_colors = [index.color[lang] for lang, _ in sorted_langs] or [get_lang_color("Other")]
     
     # Generate DNA helix
     helix_start_x = 32
@@ -297,57 +1794,38 @@ def generate_code_dna(data):
     helix_width = helix_end_x - helix_start_x
     center_y = 155
     amplitude = 40
-    num_points = 60
+    num_points = max(DNA_POINTS, 3)
+    # Rungs and dots keep roughly the same spacing at any resolution
+    stride = max(3, round(num_points / 20))
     
     # Create a hash from user data for unique pattern
     data_hash = hashlib.md5(json.dumps(sorted(languages.items())).encode()).hexdigest()
     phase_offset = int(data_hash[:4], 16) / 65535 * math.pi * 2
     freq_mod = 0.8 + (int(data_hash[4:8], 16) / 65535) * 0.6
     
-    # Draw connecting rungs first (behind strands)
-    for i in range(num_points):
-        t = i / num_points
-        x = helix_start_x + t * helix_width
-        angle = t * math.pi * 4 * freq_mod + phase_offset
-        
-        y1 = center_y + math.sin(angle) * amplitude
-        y2 = center_y - math.sin(angle) * amplitude
-        
-        # Only draw rungs at intervals
-        if i % 3 == 0:
-            # Pick language color based on position
-            lang_idx = i % len(sorted_langs) if sorted_langs else 0
-            lang_name = sorted_langs[lang_idx][0] if sorted_langs else "Other"
-            color = get_lang_color(lang_name)
-            
-            opacity = 0.15 + 0.1 * abs(math.sin(angle))
-            svg += f'  <line x1="{x:.1f}" y1="{y1:.1f}" x2="{x:.1f}" y2="{y2:.1f}" stroke="{color}" stroke-width="1.5" opacity="{opacity:.2f}"/>\n'
-    
-    # Draw strand 1 (front)
-    points_1 = []
-    points_2 = []
+    # One geometry pass shared by rungs, strands and dots
+    geo = helix_geometry(num_points, helix_start_x, helix_width, center_y, amplitude, freq_mod, phase_offset)
+    xs, sins, ys1, ys2 = geo["x"], geo["sin"], geo["y1"], geo["y2"]
     
-    for i in range(num_points + 1):
-        t = i / num_points
-        x = helix_start_x + t * helix_width
-        angle = t * math.pi * 4 * freq_mod + phase_offset
+    # Draw connecting rungs first (behind strands), only at intervals
+    for i in range(0, num_points, stride):
+        x, y1, y2 = xs[i], ys1[i], ys2[i]
         
-        y1 = center_y + math.sin(angle) * amplitude
-        y2 = center_y - math.sin(angle) * amplitude
+        # Pick language color based on position
+        color = rung_colors[i % len(rung_colors)]
         
-        points_1.append((x, y1))
-        points_2.append((x, y2))
-    
-    # Smooth path for strand 1
-    path1 = f"M {points_1[0][0]:.1f} {points_1[0][1]:.1f}"
-    for i in range(1, len(points_1)):
-        px, py = points_1[i]
-        path1 += f" L {px:.1f} {py:.1f}"
-    
-    path2 = f"M {points_2[0][0]:.1f} {points_2[0][1]:.1f}"
-    for i in range(1, len(points_2)):
-        px, py = points_2[i]
-        path2 += f" L {px:.1f} {py:.1f}"
+        opacity = 0.15 + 0.1 * abs(sins[i])
+        svg += f'  <line x1="{x:.1f}" y1="{y1:.1f}" x2="{x:.1f}" y2="{y2:.1f}" stroke="{color}" stroke-width="1.5" opacity="{opacity:.2f}"/>\n'
+    
+    # Strand paths through every sample
+    if SVG_OPTIMIZE:
+        keep1 = simplify_polyline(xs, ys1, SVG_SIMPLIFY_TOLERANCE)
+        keep2 = simplify_polyline(xs, ys2, SVG_SIMPLIFY_TOLERANCE)
+        path1 = relative_path([xs[i] for i in keep1], [ys1[i] for i in keep1])
+        path2 = relative_path([xs[i] for i in keep2], [ys2[i] for i in keep2])
+    else:
+        path1 = polyline_path(xs, ys1)
+        path2 = polyline_path(xs, ys2)
     
     # Gradient for strands
     svg += f'''  <defs>
@@ -368,20 +1846,13 @@ def generate_code_dna(data):
     svg += f'  <path d="{path2}" stroke="url(#strand2)" stroke-width="2.5" fill="none" stroke-linecap="round" opacity="0.8"/>\n'
     
     # Draw nucleotide dots at key points
-    for i in range(0, num_points + 1, 3):
-        t = i / num_points
-        x = helix_start_x + t * helix_width
-        angle = t * math.pi * 4 * freq_mod + phase_offset
-        
-        y1 = center_y + math.sin(angle) * amplitude
-        y2 = center_y - math.sin(angle) * amplitude
+    for i in range(0, num_points + 1, stride):
+        x, y1, y2 = xs[i], ys1[i], ys2[i]
         
-        lang_idx = (i // 3) % len(sorted_langs) if sorted_langs else 0
-        lang_name = sorted_langs[lang_idx][0] if sorted_langs else "Other"
-        color = get_lang_color(lang_name)
+        color = rung_colors[(i // stride) % len(rung_colors)]
         
         # Front/back effect based on sine
-        sin_val = math.sin(angle)
+        sin_val = sins[i]
         r1 = 3.5 if sin_val > 0 else 2.5
         r2 = 2.5 if sin_val > 0 else 3.5
         o1 = 0.9 if sin_val > 0 else 0.5
@@ -393,9 +1864,9 @@ def generate_code_dna(data):
     # Language legend at bottom
     legend_y = 235
     legend_x = 32
-    for i, (lang, bytes_count) in enumerate(sorted_langs[:6]):
-        pct = bytes_count / total_bytes * 100
-        color = get_lang_color(lang)
+    for i, (lang, _) in enumerate(sorted_langs[:6]):
+        pct = index.percent[lang]
+        color = index.color[lang]
         col = i % 6
         x = legend_x + col * 125
         
@@ -408,30 +1879,122 @@ def generate_code_dna(data):
     svg += f'  <text x="{width - 32}" y="{legend_y + 18}" class="small" text-anchor="end" fill="{COLORS["text_tertiary"]}">DNA #{short_hash}</text>\n'
     
     svg += svg_footer()
-    return svg
+    return svg.getvalue()
 
 
 # ============================================================
 # WIDGET 2: REPO SKYLINE
 # ============================================================
 
+# Shared window shape for <use> instancing; fill/opacity come from each <use>
+WINDOW_DEF = '\n    <rect id="win" width="4" height="6" rx="1"/>'
+# Window tile repeated by the "pattern" mode, and how many lighting
+# layouts each colour gets so neighbouring buildings don't look cloned
+WINDOW_TILE_ROWS, WINDOW_TILE_COLS = 4, 3
+WINDOW_TILE_VARIANTS = 2
+
+def skyline_window_mode():
+    mode = SKYLINE_WINDOWS or ("use" if SVG_OPTIMIZE else "rect")
+    if mode not in ("rect", "use", "pattern"):
+        raise ValueError(f"Unknown SKYLINE_WINDOWS mode {mode!r} (expected rect, use or pattern)")
+    return mode
+
+def window_pattern_id(color, variant):
+    return f"win-{color.lstrip('#')}-{variant}"
+
+def window_pattern(color, variant):
+    """<pattern> tile of lit and unlit windows in one colour.
+
+    Tiles repeat every WINDOW_TILE_ROWS rows, so a building gets the
+    lighting of one of WINDOW_TILE_VARIANTS seeded layouts instead of its
+    own; in exchange all of its windows are a single element.
+    """
+    mask = window_mask(window_pattern_id(color, variant), WINDOW_TILE_ROWS, WINDOW_TILE_COLS)
+    svg = SvgWriter()
+    svg += f'    <pattern id="{window_pattern_id(color, variant)}" width="{WINDOW_TILE_COLS * 10}" height="{WINDOW_TILE_ROWS * 14}" patternUnits="userSpaceOnUse">\n'
+    for wy in range(WINDOW_TILE_ROWS):
+        for wx in range(WINDOW_TILE_COLS):
+            lit = (mask >> (wy * WINDOW_TILE_COLS + wx)) & 1
+            svg += f'      <rect x="{wx * 10}" y="{wy * 14}" width="4" height="6" rx="1" fill="{color}" opacity="{0.4 if lit else 0.1}"/>\n'
+    svg += '    </pattern>\n'
+    return svg.getvalue()
+
+def pattern_windows(x, y, bw, bh, color, name, patterns):
+    """Single rect filling a building's window grid with a window tile.
+
+    Tiles not yet in `patterns` (id -> <pattern> markup) are added there
+    for the caller to emit inside <defs>.
+    """
+    # Same bounds test as the per-window loop, counted once
+    window_rows = int(bh / 16)
+    window_cols = max(1, int(bw / 12))
+    cols = sum(1 for wx in range(window_cols) if 6 + wx * 10 < bw - 4)
+    rows = sum(1 for wy in range(window_rows) if 10 + wy * 14 < bh - 6)
+    if not (cols and rows):
+        return ""
+    variant = stable_hash(name) % WINDOW_TILE_VARIANTS
+    pattern_id = window_pattern_id(color, variant)
+    if pattern_id not in patterns:
+        patterns[pattern_id] = window_pattern(color, variant)
+    # The transform carries the pattern origin along with the rect
+    return f'  <rect width="{(cols - 1) * 10 + 4}" height="{(rows - 1) * 14 + 6}" transform="translate({x + 6:.1f} {y + 10:.1f})" fill="url(#{pattern_id})"/>\n'
+
+def skyline_districts(repos, towers, limit):
+    """Group the repos that didn't make it into `towers` by language.
+
+    Returns up to `limit` districts, largest repo count first, each a dict
+    of language, repos, size and stars; languages past the limit are
+    folded into "Other".
+    """
+    chosen = {id(r) for r in towers}
+    groups = defaultdict(lambda: [0, 0, 0])
+    for repo in repos:
+        if id(repo) in chosen:
+            continue
+        group = groups[repo.language]
+        group[0] += 1
+        group[1] += repo.size
+        group[2] += repo.stars
+    ranked = sorted(groups.items(), key=lambda kv: (-kv[1][0], kv[0]))
+    if len(ranked) > limit:
+        # Repos with no language are already "Other"; the tail joins them
+        other = groups.get("Other", [0, 0, 0])
+        ranked = [kv for kv in ranked if kv[0] != "Other"]
+        for _, group in ranked[limit - 1:]:
+            other = [a + b for a, b in zip(other, group)]
+        ranked = ranked[:limit - 1] + [("Other", other)]
+    return [
+        {"language": lang, "repos": count, "size": size, "stars": stars}
+        for lang, (count, size, stars) in ranked
+    ]
+
+
 def generate_repo_skyline(data):
     """Generate a city skyline where buildings represent repos."""
     print("  Generating Repo Skyline...")
     
     width, height = 800, 320
-    svg = svg_header(width, height, f"@{USERNAME}'s Repo Skyline")
+    svg = SvgWriter()
+    svg += svg_header(width, height, f"@{USERNAME}'s Repo Skyline")
     svg += svg_card_bg(width, height)
     
     # Title
     svg += f'  <text x="32" y="38" class="title">Repo Skyline</text>\n'
     svg += f'  <text x="32" y="58" class="subtitle">{data["total_repos"]} repositories · {data["total_stars"]} stars</text>\n'
     
-    repos = sorted(data.get("repos", []), key=lambda r: r.get("size", 0), reverse=True)[:18]
+    windows_mode = skyline_window_mode()
+    window_patterns = {}
+    
+    # Same order as sorted(..., reverse=True)[:k], in O(n log k)
+    all_repos = data.get("repos", [])
+    repos = heapq.nlargest(SKYLINE_MAX_REPOS, all_repos, key=lambda r: r.size)
+    districts = []
+    if SKYLINE_LOD and len(all_repos) > len(repos):
+        districts = skyline_districts(all_repos, repos, max(1, SKYLINE_DISTRICTS))
     if not repos:
-        repos = [{"name": "no-repos", "language": "Other", "size": 100, "stars": 0}]
+        repos = [Repo("no-repos", "Other", 0, 100)]
     
-    max_size = max(r.get("size", 1) for r in repos) or 1
+    max_size = max(r.size for r in repos) or 1
     
     ground_y = 250
     building_area_start = 40
@@ -439,9 +2002,16 @@ def generate_repo_skyline(data):
     
     num_buildings = len(repos)
     gap = 6
+    if districts:
+        # Towers keep the left of the street, districts take the rest
+        district_area_width = building_area_width * 0.3
+        building_area_width -= district_area_width + 3 * gap
     building_width = min(36, (building_area_width - gap * (num_buildings - 1)) / num_buildings)
     total_buildings_width = num_buildings * building_width + (num_buildings - 1) * gap
-    start_x = (width - total_buildings_width) / 2
+    if districts:
+        start_x = building_area_start + (building_area_width - total_buildings_width) / 2
+    else:
+        start_x = (width - total_buildings_width) / 2
     
     # Sky gradient
     svg += f'''  <defs>
@@ -452,7 +2022,7 @@ def generate_repo_skyline(data):
     <linearGradient id="ground" x1="0" y1="0" x2="0" y2="1">
       <stop offset="0%" stop-color="{COLORS["bg_subtle"]}"/>
       <stop offset="100%" stop-color="{COLORS["bg"]}"/>
-    </linearGradient>
+    </linearGradient>{WINDOW_DEF if windows_mode == "use" else ""}
   </defs>
 '''
     
@@ -463,10 +2033,10 @@ def generate_repo_skyline(data):
     # Buildings
     for i, repo in enumerate(repos):
         x = start_x + i * (building_width + gap)
-        size = repo.get("size", 1)
-        lang = repo.get("language", "Other")
-        stars = repo.get("stars", 0)
-        name = repo.get("name", "repo")
+        size = repo.size
+        lang = repo.language
+        stars = repo.stars
+        name = repo.name
         
         # Height proportional to size (min 25, max 170)
         bh = 25 + (size / max_size) * 145
@@ -484,14 +2054,21 @@ def generate_repo_skyline(data):
         # Windows (small dots)
         window_rows = int(bh / 16)
         window_cols = max(1, int(building_width / 12))
-        for wy in range(window_rows):
-            for wx in range(window_cols):
-                win_x = x + 6 + wx * 10
-                win_y = by + 10 + wy * 14
-                if win_x < x + building_width - 4 and win_y < ground_y - 6:
-                    lit = (hash(f"{name}{wx}{wy}") % 3) != 0
-                    opacity = 0.4 if lit else 0.1
-                    svg += f'  <rect x="{win_x:.1f}" y="{win_y:.1f}" width="4" height="6" rx="1" fill="{color}" opacity="{opacity}"/>\n'
+        if windows_mode == "pattern":
+            svg += pattern_windows(x, by, building_width, bh, color, name, window_patterns)
+        else:
+            lit_mask = window_mask(name, window_rows, window_cols)
+            for wy in range(window_rows):
+                for wx in range(window_cols):
+                    win_x = x + 6 + wx * 10
+                    win_y = by + 10 + wy * 14
+                    if win_x < x + building_width - 4 and win_y < ground_y - 6:
+                        lit = (lit_mask >> (wy * window_cols + wx)) & 1
+                        opacity = 0.4 if lit else 0.1
+                        if windows_mode == "use":
+                            svg += f'  <use href="#win" x="{win_x:.1f}" y="{win_y:.1f}" fill="{color}" opacity="{opacity}"/>\n'
+                        else:
+                            svg += f'  <rect x="{win_x:.1f}" y="{win_y:.1f}" width="4" height="6" rx="1" fill="{color}" opacity="{opacity}"/>\n'
         
         # Antenna on tall buildings
         if bh > 100:
@@ -508,25 +2085,56 @@ def generate_repo_skyline(data):
         ref_h = min(bh * 0.3, 20)
         svg += f'  <rect x="{x:.1f}" y="{ground_y + 1:.1f}" width="{building_width:.1f}" height="{ref_h:.1f}" rx="2" fill="{color}" opacity="0.04"/>\n'
     
+    # Districts: the long tail as one low-rise block per language
+    if districts:
+        district_x = building_area_start + building_area_width + 3 * gap
+        district_width = (district_area_width - gap * (len(districts) - 1)) / len(districts)
+        max_count = max(d["repos"] for d in districts)
+        for i, district in enumerate(districts):
+            x = district_x + i * (district_width + gap)
+            lang = district["language"]
+            # Lower than the towers; area grows with the number of repos
+            dh = 22 + 58 * math.sqrt(district["repos"] / max_count)
+            dy = ground_y - dh
+            color = get_lang_color(lang)
+            
+            svg += f'  <rect x="{x:.1f}" y="{dy:.1f}" width="{district_width:.1f}" height="{dh:.1f}" rx="2" fill="{color}" opacity="0.12">'
+            svg += f'<title>{lang} · {district["repos"]} repos · {district["stars"]} stars</title></rect>\n'
+            svg += f'  <rect x="{x:.1f}" y="{dy:.1f}" width="{district_width:.1f}" height="{dh:.1f}" rx="2" fill="none" stroke="{color}" stroke-width="1" stroke-dasharray="3 2" opacity="0.35"/>\n'
+            svg += pattern_windows(x, dy, district_width, dh, color, f"district:{lang}", window_patterns)
+            svg += f'  <text x="{x + district_width / 2:.1f}" y="{dy - 6:.1f}" text-anchor="middle" font-size="9" fill="{COLORS["text_tertiary"]}">{district["repos"]:,}</text>\n'
+            # Name on the ground, clipped to roughly what fits the block
+            label = lang if len(lang) * 5 <= district_width else lang[:max(1, int(district_width / 5) - 1)] + "…"
+            svg += f'  <text x="{x + district_width / 2:.1f}" y="{ground_y + 14}" text-anchor="middle" font-size="8" fill="{COLORS["text_tertiary"]}">{label}</text>\n'
+    
+    if window_patterns:
+        svg += "  <defs>\n" + "".join(window_patterns.values()) + "  </defs>\n"
+    
     # Repo names along the bottom
-    svg += f'  <text x="{width / 2}" y="{ground_y + 40}" text-anchor="middle" class="small" fill="{COLORS["text_tertiary"]}">Each building represents a repository · Height = codebase size · Color = primary language</text>\n'
+    if districts:
+        grouped = sum(d["repos"] for d in districts)
+        caption = f"Top {num_buildings} repositories as buildings · {grouped:,} more grouped into districts · Color = primary language"
+    else:
+        caption = "Each building represents a repository · Height = codebase size · Color = primary language"
+    svg += f'  <text x="{width / 2}" y="{ground_y + 40}" text-anchor="middle" class="small" fill="{COLORS["text_tertiary"]}">{caption}</text>\n'
     
     # Top language legend
-    top_langs = sorted(data.get("languages", {}).items(), key=lambda x: x[1], reverse=True)[:5]
+    index = language_index(data)
+    top_langs = index.top(5)
     legend_x = width - 32
     for i, (lang, _) in enumerate(top_langs):
         lx = legend_x - (len(top_langs) - 1 - i) * 90
-        color = get_lang_color(lang)
+        color = index.color[lang]
         svg += f'  <circle cx="{lx - 8}" cy="48" r="4" fill="{color}" opacity="0.7"/>\n'
         svg += f'  <text x="{lx}" y="52" class="small" fill="{COLORS["text_secondary"]}">{lang}</text>\n'
     
     # Stats row at bottom
     stats_y = height - 22
     svg += f'  <text x="32" y="{stats_y}" class="small" fill="{COLORS["text_tertiary"]}">'
-    svg += f'{data["total_repos"]} repos · {len(data.get("languages", {}))} languages · {data["total_stars"]} ★</text>\n'
+    svg += f'{data["total_repos"]} repos · {len(index)} languages · {data["total_stars"]} ★</text>\n'
     
     svg += svg_footer()
-    return svg
+    return svg.getvalue()
 
 
 # ============================================================
@@ -538,7 +2146,8 @@ def generate_skill_tree(data):
     print("  Generating Skill Tree...")
     
     width, height = 800, 400
-    svg = svg_header(width, height, f"@{USERNAME}'s Skill Tree")
+    svg = SvgWriter()
+    svg += svg_header(width, height, f"@{USERNAME}'s Skill Tree")
     svg += svg_card_bg(width, height)
     
     # Title
@@ -546,31 +2155,8 @@ def generate_skill_tree(data):
     svg += f'  <text x="32" y="58" class="subtitle">Languages &amp; frameworks mastery</text>\n'
     
     # Calculate XP for each language
-    languages = data.get("languages", {})
-    total_bytes = sum(languages.values()) or 1
-    sorted_langs = sorted(languages.items(), key=lambda x: x[1], reverse=True)
-    
-    # Categorize languages
-    categories = {
-        "Frontend": ["JavaScript", "TypeScript", "HTML", "CSS", "SCSS", "Vue", "Svelte", "Dart"],
-        "Backend": ["Python", "Java", "Go", "Rust", "Ruby", "PHP", "C#", "Kotlin", "Scala", "Elixir", "Perl", "C", "C++", "Haskell"],
-        "Data & ML": ["Jupyter Notebook", "R", "Lua"],
-        "DevOps": ["Shell", "Dockerfile"],
-    }
-    
-    categorized = {}
-    for cat, cat_langs in categories.items():
-        items = [(lang, bytes_count) for lang, bytes_count in sorted_langs if lang in cat_langs]
-        if items:
-            categorized[cat] = items
-    
-    # Also add uncategorized
-    all_categorized = set()
-    for cat_langs in categories.values():
-        all_categorized.update(cat_langs)
-    uncategorized = [(lang, b) for lang, b in sorted_langs if lang not in all_categorized]
-    if uncategorized:
-        categorized["Other"] = uncategorized
+    index = language_index(data)
+    categorized = index.categories
     
     # Layout
     cat_names = list(categorized.keys())
@@ -588,7 +2174,7 @@ def generate_skill_tree(data):
         "Other": COLORS["text_tertiary"],
     }
     
-    max_bytes = max(languages.values()) if languages else 1
+    max_bytes = index.max_bytes
     
     for ci, cat in enumerate(cat_names):
         cx = 32 + ci * col_width + col_width / 2
@@ -628,7 +2214,7 @@ def generate_skill_tree(data):
                 level = "Novice"
                 level_color = COLORS["text_tertiary"]
             
-            lang_color = get_lang_color(lang)
+            lang_color = index.color[lang]
             node_x = cx
             
             # Connection dot
@@ -655,12 +2241,12 @@ def generate_skill_tree(data):
             svg += f'  <text x="{bar_x + full_bar_width + 4}" y="{sy + 1}" font-size="8" font-weight="600" fill="{level_color}" letter-spacing="0.5">{level.upper()}</text>\n'
     
     # Footer stats
-    total_langs = len(sorted_langs)
-    master_count = sum(1 for _, b in sorted_langs if b / max_bytes > 0.7)
+    total_langs = len(index)
+    master_count = sum(1 for _, b in index.ranked if b / max_bytes > 0.7)
     svg += f'  <text x="32" y="{height - 22}" class="small" fill="{COLORS["text_tertiary"]}">{total_langs} skills unlocked · {master_count} mastered</text>\n'
     
     svg += svg_footer()
-    return svg
+    return svg.getvalue()
 
 
 # ============================================================
@@ -672,7 +2258,8 @@ def generate_code_weather(data):
     print("  Generating Code Weather...")
     
     width, height = 800, 300
-    svg = svg_header(width, height, f"@{USERNAME}'s Code Weather")
+    svg = SvgWriter()
+    svg += svg_header(width, height, f"@{USERNAME}'s Code Weather")
     svg += svg_card_bg(width, height)
     
     daily = data.get("daily_activity", {})
@@ -839,7 +2426,7 @@ def generate_code_weather(data):
     svg += f'Today: {today_count} commits · 7-day avg: {avg_7:.1f} · 30-day avg: {avg_30:.1f}</text>\n'
     
     svg += svg_footer()
-    return svg
+    return svg.getvalue()
 
 
 # ============================================================
@@ -853,11 +2440,6 @@ def generate_readme(data):
     user = data.get("user", {})
     name = user.get("name", USERNAME)
     
-    # Top languages for badges
-    languages = data.get("languages", {})
-    total = sum(languages.values()) or 1
-    top_langs = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:6]
-    
     readme = f'''<div align="center">
 
 # Hey, I'm {name} 👋
@@ -981,19 +2563,39 @@ jobs:
         with:
           python-version: '3.11'
 
+      - name: Restore GitHub API cache
+        uses: actions/cache@v4
+        with:
+          path: .cache
+          key: github-api-${{ github.run_id }}
+          restore-keys: |
+            github-api-
+
       - name: Install dependencies
         run: |
           python -m pip install --upgrade pip
           pip install requests
 
       - name: Generate widgets
+        id: generate
         env:
           GITHUB_TOKEN: ${{ secrets.GITHUB_TOKEN }}
           GITHUB_USERNAME: ${{ github.repository_owner }}
           OUTPUT_DIR: widgets
-        run: python scripts/generate_widgets.py
+        run: |
+          set +e
+          python scripts/generate_widgets.py --exit-code
+          status=$?
+          if [ "$status" -eq 3 ]; then
+            echo "changed=false" >> "$GITHUB_OUTPUT"
+          elif [ "$status" -eq 0 ]; then
+            echo "changed=true" >> "$GITHUB_OUTPUT"
+          else
+            exit "$status"
+          fi
 
       - name: Commit and push changes
+        if: steps.generate.outputs.changed == 'true'
         run: |
           git config --local user.email "action@github.com"
           git config --local user.name "GitHub Action"
@@ -1005,51 +2607,427 @@ jobs:
 '''
 
 
+# ============================================================
+# RENDER PIPELINE
+# ============================================================
+
+# Output file (inside OUTPUT_DIR) -> (generator, the slice of `data` it reads).
+# Each generator is a pure function of that slice, which is what lets the
+# render cache skip widgets whose inputs didn't change. "today" stands for
+# the current date, for widgets that count back from it.
+WIDGETS = {
+    "code-dna.svg": (generate_code_dna, ("languages",)),
+    "repo-skyline.svg": (generate_repo_skyline, ("repos", "languages", "total_repos", "total_stars")),
+    "skill-tree.svg": (generate_skill_tree, ("languages",)),
+    "code-weather.svg": (generate_code_weather, ("daily_activity", "today")),
+}
+README_DEPS = ("user.name",)
+
+
+def render_targets(output_dir=None, readme_path="README.md"):
+    """(path, generator, deps) for every artifact a run produces."""
+    output_dir = output_dir or OUTPUT_DIR
+    targets = [(os.path.join(output_dir, name), func, deps) for name, (func, deps) in WIDGETS.items()]
+    targets.append((readme_path, generate_readme, README_DEPS))
+    return targets
+
+
+# ============================================================
+# RENDER CACHE
+# ============================================================
+
+RENDER_STATS = defaultdict(lambda: {"hit": 0, "miss": 0})
+_source_hash = None
+
+
+def _code_fingerprint():
+    """Hash of this script, so any code change invalidates cached renders."""
+    global _source_hash
+    if _source_hash is None:
+        with open(os.path.abspath(__file__), "rb") as f:
+            _source_hash = hashlib.sha256(f.read()).hexdigest()
+    return _source_hash
+
+
+# Configuration that changes rendered output without changing `data`:
+# fingerprint key -> module global
+RENDER_SETTINGS = {
+    "username": "USERNAME",
+    "dna_points": "DNA_POINTS",
+    "optimize": "SVG_OPTIMIZE",
+    "simplify_tolerance": "SVG_SIMPLIFY_TOLERANCE",
+    "skyline_max_repos": "SKYLINE_MAX_REPOS",
+    "skyline_windows": "SKYLINE_WINDOWS",
+    "skyline_lod": "SKYLINE_LOD",
+    "skyline_districts": "SKYLINE_DISTRICTS",
+}
+
+
+def render_settings():
+    """Current values of RENDER_SETTINGS, keyed as in render fingerprints."""
+    return {key: globals()[name] for key, name in RENDER_SETTINGS.items()}
+
+
+def apply_render_settings(settings):
+    """Process pool initializer: adopt the parent's render settings.
+    
+    Workers started with spawn or forkserver re-import the module and
+    only see the environment defaults, not what --optimize, a snapshot
+    or batch mode changed at runtime.
+    """
+    globals().update({RENDER_SETTINGS[key]: value for key, value in settings.items()})
+
+
+def _resolve_dep(data, dep):
+    if dep == "today":
+        return datetime.now().strftime("%Y-%m-%d")
+    value = data
+    for part in dep.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def render_fingerprint(name, deps, data):
+    """Fingerprint of everything a widget's output depends on."""
+    payload = {
+        "widget": name,
+        "code": _code_fingerprint(),
+        "settings": render_settings(),
+        "inputs": {dep: _resolve_dep(data, dep) for dep in deps},
+    }
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _render_cache_path(fingerprint):
+    return os.path.join(RENDER_CACHE_DIR, f"{fingerprint}.render")
+
+
+def render_cache_get(name, fingerprint):
+    """Cached output for a fingerprint, or None; counts hits and misses."""
+    content = None
+    if RENDER_CACHE_DIR:
+        path = _render_cache_path(fingerprint)
+        try:
+            with open(path, encoding="utf-8") as f:
+                content = f.read()
+            os.utime(path)
+        except OSError:
+            content = None
+    RENDER_STATS[name]["hit" if content is not None else "miss"] += 1
+    return content
+
+
+def render_cache_put(fingerprint, content):
+    if not RENDER_CACHE_DIR:
+        return
+    path = _render_cache_path(fingerprint)
+    try:
+        write_atomic(path, content)
+    except OSError as e:
+        print(f"  Render cache write failed: {e}")
+
+
+def evict_render_cache(max_bytes=None):
+    max_bytes = RENDER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    return evict_lru_files(RENDER_CACHE_DIR, max_bytes, ".render")
+
+
+def render_widget(func, data):
+    """Run a generator, then the output optimization stage if enabled."""
+    content = func(data)
+    if SVG_OPTIMIZE and content.startswith("<svg"):
+        content = compact_svg(content)
+    return content
+
+
+def _timed_render(func, data):
+    """Render in a worker; returns (content, (start, end, pid, tid))."""
+    start = time.perf_counter()
+    content = render_widget(func, data)
+    return content, (start, time.perf_counter(), os.getpid(), threading.get_native_id())
+
+
+def write_if_changed(path, content):
+    """Write `content` unless the file on disk already has the same hash.
+
+    Skipping identical writes leaves mtimes alone, so the workflow's
+    git add/diff has nothing to look at. Returns True if the file changed.
+    """
+    encoded = content.encode()
+    try:
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(encoded).digest():
+                return False
+    except OSError:
+        pass
+    with open(path, "wb") as f:
+        f.write(encoded)
+    return True
+
+
+def write_artifact(path, content):
+    """Write a rendered artifact; returns (changed, seconds spent)."""
+    start = time.perf_counter()
+    changed = write_if_changed(path, content)
+    end = time.perf_counter()
+    if TRACER.enabled:
+        TRACER.add(f"write {os.path.basename(path)}", "write", start, end,
+                   {"path": path, "bytes": len(content.encode()), "changed": changed})
+    return changed, end - start
+
+
+def render_all(data, targets, workers=None, executor=None):
+    """Render every target concurrently and write each one as it finishes.
+
+    Targets whose input fingerprint is in the render cache are served from
+    it without running the generator. A process pool sidesteps the GIL for
+    large layouts; threads are cheaper to start for the default sizes.
+
+    Returns {path: {"render": s, "write": s, "bytes": n, "changed": bool,
+    "cached": bool}} in target order.
+    """
+    workers = RENDER_WORKERS if workers is None else workers
+    executor = (executor or RENDER_EXECUTOR).lower()
+    timings = {}
+    # One language index shared by every widget
+    data = {**data, "language_index": LanguageIndex(data.get("languages", {}))}
+    
+    def finish(path, content, render_seconds, cached=False):
+        changed, write_seconds = write_artifact(path, content)
+        timings[path] = {
+            "render": render_seconds,
+            "write": write_seconds,
+            "bytes": len(content.encode()),
+            "changed": changed,
+            "cached": cached,
+        }
+        print(f"  {'✓' if changed else '='} {path}{'' if changed else ' (unchanged)'}")
+    
+    # Serve what we can from the render cache; only misses get rendered
+    pending = []
+    for path, func, deps in targets:
+        name = os.path.basename(path)
+        fingerprint = render_fingerprint(name, deps, data)
+        content = render_cache_get(name, fingerprint)
+        if content is not None:
+            finish(path, content, 0.0, cached=True)
+        else:
+            pending.append((path, func, fingerprint))
+    
+    def rendered(path, fingerprint, content, timing):
+        start, end, pid, tid = timing
+        TRACER.add(f"render {os.path.basename(path)}", "render", start, end, {"path": path}, pid, tid)
+        render_cache_put(fingerprint, content)
+        finish(path, content, end - start)
+    
+    if workers <= 1 or len(pending) <= 1:
+        for path, func, fingerprint in pending:
+            rendered(path, fingerprint, *_timed_render(func, data))
+    else:
+        max_workers = min(workers, len(pending))
+        if executor == "process":
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=apply_render_settings,
+                                       initargs=(render_settings(),))
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        with pool:
+            futures = {
+                pool.submit(_timed_render, func, data): (path, fingerprint)
+                for path, func, fingerprint in pending
+            }
+            for future in as_completed(futures):
+                rendered(*futures[future], *future.result())
+    
+    evict_render_cache()
+    return {path: timings[path] for path, _, _ in targets}
+
+
+def print_timing_report(timings):
+    print(f"\n   {'artifact':<34} {'render':>9} {'write':>9} {'bytes':>9} {'cache':>6}")
+    for path, t in timings.items():
+        print(f"   {path:<34} {t['render'] * 1000:>7.1f}ms {t['write'] * 1000:>7.1f}ms {t['bytes']:>9,} "
+              f"{'hit' if t['cached'] else 'miss':>6}{'' if t['changed'] else '  unchanged'}")
+    hits = sum(stats["hit"] for stats in RENDER_STATS.values())
+    misses = sum(stats["miss"] for stats in RENDER_STATS.values())
+    print(f"   Render cache: {hits} hits · {misses} misses")
+
+
+# ============================================================
+# BATCH MODE
+# ============================================================
+
+def generate_batch(users, output_root=None):
+    """Fetch and render widgets for several users in one process.
+
+    Each user gets output_root/<user>/README.md with the widgets beside it
+    in widgets/, the layout the README's image links expect. Users are
+    handled one after another in one process, so they share the
+    keep-alive HTTP session and pay interpreter startup once. Returns
+    {user: render_all() timings}.
+    """
+    global USERNAME
+    output_root = output_root or OUTPUT_DIR
+    source = get_data_source() if GITHUB_TOKEN else None
+    saved_username = USERNAME
+    results = {}
+    try:
+        for user in dict.fromkeys(users):
+            USERNAME = user
+            print(f"\n[{user}]")
+            if source:
+                with TRACER.span(f"fetch {user}", "fetch", source=DATA_SOURCE.lower()):
+                    data = source()
+            else:
+                data = get_mock_data()
+            user_dir = os.path.join(output_root, user)
+            widgets_dir = os.path.join(user_dir, "widgets")
+            os.makedirs(widgets_dir, exist_ok=True)
+            results[user] = render_all(data, render_targets(widgets_dir, os.path.join(user_dir, "README.md")))
+    finally:
+        USERNAME = saved_username
+    if source:
+        evict_http_cache()
+    return results
+
+
 # ============================================================
 # MAIN
 # ============================================================
 
-def main():
-    print("=" * 50)
-    print("  GitHub Profile Widgets Generator")
-    print("=" * 50)
+# Exit status for --exit-code when every artifact matched what was on disk
+EXIT_NO_CHANGES = 3
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate GitHub profile widgets.")
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="simplify paths and compact numbers in the SVG output (same as SVG_OPTIMIZE=1)",
+    )
+    parser.add_argument(
+        "--exit-code", action="store_true",
+        help=f"exit with status {EXIT_NO_CHANGES} when no artifact changed (0 when something did)",
+    )
+    parser.add_argument(
+        "--from-snapshot", metavar="PATH",
+        help="render offline from a data snapshot instead of fetching",
+    )
+    parser.add_argument(
+        "--from-mock", action="store_true",
+        help="render the built-in mock data even when GITHUB_TOKEN is set (never touches the network)",
+    )
+    parser.add_argument(
+        "--save-snapshot", metavar="PATH",
+        help="write the fetched data to a snapshot for later --from-snapshot runs",
+    )
+    parser.add_argument(
+        "--trace", metavar="PATH",
+        help="write a Chrome trace of API calls, fetch stages, renders and writes (same as TRACE_FILE=PATH)",
+    )
+    parser.add_argument(
+        "--users", nargs="+", metavar="USER",
+        help="batch mode: generate each user's README and widgets/ into OUTPUT_DIR/<user>/ in one process, sharing one connection pool",
+    )
+    parser.add_argument(
+        "--fetch-workers", type=int, metavar="N",
+        help=f"concurrent /languages requests (default FETCH_WORKERS={FETCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--render-workers", type=int, metavar="N",
+        help=f"widgets rendered concurrently (default RENDER_WORKERS={RENDER_WORKERS})",
+    )
+    args = parser.parse_args(argv)
+    if args.users and (args.from_snapshot or args.save_snapshot):
+        parser.error("--users cannot be combined with --from-snapshot or --save-snapshot")
+    if args.from_mock and (args.users or args.from_snapshot):
+        parser.error("--from-mock cannot be combined with --users or --from-snapshot")
+    return args
+
+
+def generate_single(args):
+    """The default run: one user's widgets into OUTPUT_DIR."""
+    global USERNAME
     
     # Fetch data (use real API if token available, else mock)
-    if GITHUB_TOKEN:
-        print("Using GitHub API with token...")
-        data = fetch_user_data()
+    if args.from_snapshot:
+        print(f"Rendering offline from snapshot {args.from_snapshot}...")
+        USERNAME, data = load_data_snapshot(args.from_snapshot)
+    elif args.from_mock:
+        print("Using mock data (--from-mock)...")
+        data = get_mock_data()
+    elif GITHUB_TOKEN:
+        source = get_data_source()
+        print(f"Using GitHub API with token ({DATA_SOURCE.lower()})...")
+        with TRACER.span(f"fetch {USERNAME}", "fetch", source=DATA_SOURCE.lower()):
+            data = source()
+        evict_http_cache()
     else:
         print("No GITHUB_TOKEN found, using mock data for preview...")
         data = get_mock_data()
     
+    if args.save_snapshot:
+        save_data_snapshot(data, args.save_snapshot)
+        print(f"Saved data snapshot to {args.save_snapshot}")
+    
     # Ensure output directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    # Generate all widgets
+    # Generate all widgets and the README
     print("\nGenerating widgets...")
+    return render_all(data, render_targets())
+
+
+def main(argv=None):
+    global SVG_OPTIMIZE, FETCH_WORKERS, RENDER_WORKERS, TRACE_FILE
+    args = parse_args(argv)
+    if args.optimize:
+        SVG_OPTIMIZE = True
+    if args.trace:
+        TRACE_FILE = args.trace
+    TRACER.enabled = bool(TRACE_FILE)
+    if args.fetch_workers is not None:
+        FETCH_WORKERS = args.fetch_workers
+    if args.render_workers is not None:
+        RENDER_WORKERS = args.render_workers
     
-    widgets = {
-        "code-dna.svg": generate_code_dna(data),
-        "repo-skyline.svg": generate_repo_skyline(data),
-        "skill-tree.svg": generate_skill_tree(data),
-        "code-weather.svg": generate_code_weather(data),
-    }
-    
-    for filename, svg_content in widgets.items():
-        filepath = os.path.join(OUTPUT_DIR, filename)
-        with open(filepath, "w") as f:
-            f.write(svg_content)
-        print(f"  ✓ {filepath}")
+    print("=" * 50)
+    print("  GitHub Profile Widgets Generator")
+    print("=" * 50)
     
-    # Generate README
-    readme = generate_readme(data)
-    with open("README.md", "w") as f:
-        f.write(readme)
-    print("  ✓ README.md")
+    if args.users:
+        print(f"Batch mode: {len(set(args.users))} users{'' if GITHUB_TOKEN else ' (no GITHUB_TOKEN, using mock data)'}...")
+        results = generate_batch(args.users)
+        timings = {path: t for user_timings in results.values() for path, t in user_timings.items()}
+        output_dir = os.path.join(OUTPUT_DIR, "<user>")
+    else:
+        timings = generate_single(args)
+        output_dir = OUTPUT_DIR
     
+    changed = [path for path, t in timings.items() if t["changed"]]
     print("\n✅ All widgets generated successfully!")
-    print(f"   Output directory: {OUTPUT_DIR}/")
+    print(f"   Output directory: {output_dir}/")
+    print(f"   Changed: {', '.join(changed) if changed else 'nothing'}")
+    print_timing_report(timings)
+    
+    if API_STATS["requests"]:
+        conns = connection_stats()
+        print(f"   API: {API_STATS['requests']} requests · {conns['opened']} connections opened · "
+              f"{conns['reused']} reused · {API_STATS['retries']} retries · "
+              f"{API_STATS['not_modified']} not modified · {API_STATS['coalesced']} coalesced · "
+              f"{API_STATS['memo_hits']} memo hits")
+    if RATE_LIMITER.summary():
+        print(f"   {RATE_LIMITER.summary()}")
+    if TRACE_FILE:
+        TRACER.save(TRACE_FILE)
+        spans = " · ".join(f"{cat} {t['count']}× {t['seconds'] * 1000:.1f}ms" for cat, t in TRACER.summary().items())
+        print(f"   Trace: {TRACE_FILE} ({spans})")
+    
+    if args.exit_code and not changed:
+        return EXIT_NO_CHANGES
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(run_profiled(main) if PROFILE_FILE else main())